@@ -1,6 +1,6 @@
 # Core package for macro engine
-from .config import MacroConfig
+from .config import ConfigSnapshot, MacroConfig
 from .macro_engine import MacroEngine
 from .win_input import DirectInputController, get_direct_input_controller, WINDOWS_AVAILABLE
 
-__all__ = ['MacroConfig', 'MacroEngine', 'DirectInputController', 'get_direct_input_controller', 'WINDOWS_AVAILABLE']
\ No newline at end of file
+__all__ = ['ConfigSnapshot', 'MacroConfig', 'MacroEngine', 'DirectInputController', 'get_direct_input_controller', 'WINDOWS_AVAILABLE']
\ No newline at end of file
@@ -1,30 +1,214 @@
 # Configuration management for macro settings
+import copy
+import hashlib
 import os
-import yaml
-from typing import Dict, Any, List, Optional
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, List, NamedTuple, Optional
+
+# JSON is only used for the parsed-config sidecar and settings digests;
+# prefer orjson when installed
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+    
+    def _canonical_json(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    import json
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    
+    def _canonical_json(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    
+    _json_loads = json.loads
 
 DEFAULT_CONFIG_PATH = os.path.expanduser("~/.macro_imba/config.yaml")
 
+# PyYAML is imported on first use; cached loads never need it
+_yaml = None
+_Loader = None
+_Dumper = None
+_RESOLVER = None
+
+
+def _get_yaml():
+    """Import PyYAML on first use, preferring the libyaml C bindings."""
+    global _yaml, _Loader, _Dumper, _RESOLVER
+    if _yaml is None:
+        import yaml
+        try:
+            from yaml import CSafeLoader as loader, CSafeDumper as dumper
+        except ImportError:
+            from yaml import SafeLoader as loader, SafeDumper as dumper
+        _Loader, _Dumper = loader, dumper
+        _RESOLVER = yaml.resolver.Resolver()
+        _yaml = yaml
+    return _yaml
+
+# Parsed config files keyed by (path, mtime_ns, size), so reloading an
+# unchanged file skips the YAML parser entirely
+_PARSE_CACHE_SIZE = 8
+_PARSE_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+# Parsed config files keyed by a digest of their bytes; catches files that
+# were rewritten or touched without their contents changing
+_CONTENT_CACHE_SIZE = 64
+_CONTENT_CACHE: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+
+def _settings_digest(settings: Dict[str, Any]) -> Optional[bytes]:
+    """Digest of the settings' canonical JSON form, or None if it has none."""
+    try:
+        data = _canonical_json(settings)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _cache_put(cache: "OrderedDict", key: Any, value: Dict[str, Any], size: int) -> None:
+    """Store a private copy of parsed settings, evicting the oldest entries."""
+    cache[key] = copy.deepcopy(value)
+    if len(cache) > size:
+        cache.popitem(last=False)
+
+
+# Strings that can be written as plain YAML scalars (unless they resolve to
+# another type, such as '1' or 'yes')
+_PLAIN_SCALAR_RE = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_./\- ]*\Z")
+_STR_TAG = "tag:yaml.org,2002:str"
+
+
+def _emit_scalar(value: Any) -> str:
+    """Emit a scalar (or empty collection) the way the YAML dumper would."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, str):
+        if (_PLAIN_SCALAR_RE.match(value) and not value.endswith(" ")
+                and _RESOLVER.resolve(_yaml.ScalarNode, value, (True, False)) == _STR_TAG):
+            return value
+        if not value.isprintable():
+            raise ValueError(f"cannot emit string {value!r}")
+        return "'" + value.replace("'", "''") + "'"
+    if value == {} or value == []:
+        return "{}" if isinstance(value, dict) else "[]"
+    raise ValueError(f"cannot emit value of type {type(value).__name__}")
+
+
+def _emit_block(value: Any, indent: int, lines: List[str]) -> None:
+    """Emit a non-empty mapping or sequence in block style."""
+    pad = " " * indent
+    if isinstance(value, dict):
+        for key in sorted(value):
+            if not isinstance(key, str):
+                raise ValueError(f"cannot emit key {key!r}")
+            item = value[key]
+            if isinstance(item, dict) and item:
+                lines.append(f"{pad}{_emit_scalar(key)}:")
+                _emit_block(item, indent + 2, lines)
+            elif isinstance(item, list) and item:
+                # Sequences are not indented relative to their key
+                lines.append(f"{pad}{_emit_scalar(key)}:")
+                _emit_block(item, indent, lines)
+            else:
+                lines.append(f"{pad}{_emit_scalar(key)}: {_emit_scalar(item)}")
+    else:
+        for item in value:
+            if isinstance(item, (dict, list)) and item:
+                # Nested collections start on the "- " line
+                start = len(lines)
+                _emit_block(item, indent + 2, lines)
+                lines[start] = f"{pad}- {lines[start][indent + 2:]}"
+            else:
+                lines.append(f"{pad}- {_emit_scalar(item)}")
+
+
+def _emit_config(settings: Dict[str, Any]) -> str:
+    """Emit settings as block-style YAML.
+    
+    Supports only the subset of YAML the config uses (mappings with string
+    keys, lists, strings, ints, bools and None) and raises ValueError for
+    anything else.
+    """
+    _get_yaml()
+    if not settings:
+        return "{}\n"
+    lines: List[str] = []
+    _emit_block(settings, 0, lines)
+    return "\n".join(lines) + "\n"
+
+
+class ConfigSnapshot(NamedTuple):
+    """Point-in-time copy of the settings read by the GUI."""
+    quick_cast_enabled: bool
+    quick_cast_hotkeys: Dict[str, str]
+    item_enabled: bool
+    item_hotkeys: Dict[str, str]
+    auto_cast_enabled: bool
+    auto_cast_skills: List[Dict[str, Any]]
+    macros: List[Dict[str, Any]]
+    global_hotkey: str
+
 
 class MacroConfig:
     """Configuration manager for macro settings."""
     
+    __slots__ = (
+        'config_path', 'settings', '_saved_digest', '_dir_ok', '_batch_depth',
+    )
+    
     def __init__(self, config_path: Optional[str] = None):
         self.config_path = config_path or DEFAULT_CONFIG_PATH
         self.settings: Dict[str, Any] = self._get_default_settings()
+        # Digest of the settings as last loaded or saved; unchanged settings
+        # are not serialized again
+        self._saved_digest: Optional[bytes] = None
+        self._dir_ok = False
+        # Nesting depth of batch() blocks; saves wait for the outermost
+        self._batch_depth = 0
         self._ensure_config_dir()
         
     def _ensure_config_dir(self) -> bool:
         """Create config directory if it doesn't exist."""
+        if self._dir_ok:
+            return True
         config_dir = os.path.dirname(self.config_path)
         if config_dir and not os.path.exists(config_dir):
             try:
                 os.makedirs(config_dir)
-                return True
             except (OSError, PermissionError):
                 return False
+        self._dir_ok = True
         return True
     
+    @property
+    def json_cache_path(self) -> str:
+        """Path of the JSON sidecar holding the parsed config."""
+        return self.config_path + ".json"
+    
+    def _write_atomic(self, data: bytes, path: Optional[str] = None) -> None:
+        """Write data to the config path (or another path) through a temporary file."""
+        path = path or self.config_path
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except IOError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
     def _get_default_settings(self) -> Dict[str, Any]:
         """Get default configuration settings."""
         return {
@@ -62,29 +246,150 @@ class MacroConfig:
             "toggle_enabled": True
         }
     
+    def reset_to_defaults(self) -> None:
+        """Discard the current settings in favour of the defaults.
+        
+        The config file is left alone until the next save().
+        """
+        self.settings = self._get_default_settings()
+    
     def load(self) -> bool:
         """Load configuration from file."""
-        if not os.path.exists(self.config_path):
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
             return False
         
-        try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                loaded = yaml.safe_load(f)
-                if loaded:
-                    self.settings.update(loaded)
+        # The file no longer necessarily matches what this instance last wrote
+        self._saved_digest = None
+        
+        key = (self.config_path, st.st_mtime_ns, st.st_size)
+        cached = _PARSE_CACHE.get(key)
+        if cached is not None:
+            _PARSE_CACHE.move_to_end(key)
+            self.settings.update(copy.deepcopy(cached))
+            self._saved_digest = _settings_digest(self.settings)
             return True
-        except (yaml.YAMLError, IOError):
-            return False
+        
+        loaded = self._load_json_cache(st)
+        if loaded is None:
+            try:
+                with open(self.config_path, "rb") as f:
+                    data = f.read()
+            except IOError:
+                return False
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            cached = _CONTENT_CACHE.get(digest)
+            if cached is not None:
+                _CONTENT_CACHE.move_to_end(digest)
+                loaded = copy.deepcopy(cached)
+            else:
+                yaml = _get_yaml()
+                try:
+                    loaded = yaml.load(data, Loader=_Loader)
+                except yaml.YAMLError:
+                    return False
+                if isinstance(loaded, dict):
+                    _cache_put(_CONTENT_CACHE, digest, loaded, _CONTENT_CACHE_SIZE)
+            if isinstance(loaded, dict):
+                self._write_json_cache(loaded)
+        
+        if loaded:
+            self.settings.update(loaded)
+        if isinstance(loaded, dict):
+            _cache_put(_PARSE_CACHE, key, loaded, _PARSE_CACHE_SIZE)
+        self._saved_digest = _settings_digest(self.settings)
+        return True
+    
+    def _load_json_cache(self, yaml_stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Load the JSON sidecar if it is newer than the YAML file."""
+        try:
+            if os.stat(self.json_cache_path).st_mtime_ns <= yaml_stat.st_mtime_ns:
+                return None
+            with open(self.json_cache_path, "rb") as f:
+                loaded = _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+        return loaded if isinstance(loaded, dict) else None
+    
+    def _write_json_cache(self, settings: Dict[str, Any]) -> None:
+        """Write the JSON sidecar; it is only a cache, so failures are ignored."""
+        try:
+            self._write_atomic(_json_dumps(settings), self.json_cache_path)
+        except (OSError, TypeError, ValueError):
+            pass
     
     def save(self) -> bool:
-        """Save configuration to file."""
+        """Save configuration to file.
+        
+        Skips serializing and writing when the settings match the last load
+        or save, and writes through a temporary file so a failed save never
+        truncates the config. Inside a batch() block the write is deferred to
+        the end of the block.
+        
+        The settings are compared by digest rather than tracked through the
+        setters, since the getters hand out live references that callers may
+        change in place.
+        """
+        if self._batch_depth:
+            return True
+        
+        digest = _settings_digest(self.settings)
+        if digest is not None and digest == self._saved_digest:
+            return True
+        
+        try:
+            text = _emit_config(self.settings)
+        except ValueError:
+            text = _get_yaml().dump(
+                self.settings, Dumper=_Dumper, default_flow_style=False, allow_unicode=True
+            )
+        data = text.encode("utf-8")
+        
         try:
             self._ensure_config_dir()
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                yaml.dump(self.settings, f, default_flow_style=False, allow_unicode=True)
-            return True
+            try:
+                self._write_atomic(data)
+            except FileNotFoundError:
+                # Directory vanished since it was last checked; recreate and retry once
+                self._dir_ok = False
+                self._ensure_config_dir()
+                self._write_atomic(data)
         except IOError:
             return False
+        
+        self._write_json_cache(self.settings)
+        self._saved_digest = digest
+        return True
+    
+    @contextmanager
+    def batch(self):
+        """Group several changes into a single write.
+        
+        save() calls inside the block are deferred, and the outermost block
+        saves once when it exits normally. A failed save leaves the last saved
+        digest alone, so the next save() retries it.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth:
+            self.save()
+    
+    def snapshot(self) -> ConfigSnapshot:
+        """Get a copy of all settings at once, unaffected by later changes."""
+        return ConfigSnapshot(
+            quick_cast_enabled=self.get_quick_cast_enabled(),
+            quick_cast_hotkeys=dict(self.get_quick_cast_hotkeys()),
+            item_enabled=self.get_item_enabled(),
+            item_hotkeys=dict(self.get_item_hotkeys()),
+            auto_cast_enabled=self.get_auto_cast_enabled(),
+            auto_cast_skills=copy.deepcopy(self.get_auto_cast_skills()),
+            macros=copy.deepcopy(self.get_macros()),
+            global_hotkey=self.get_global_hotkey(),
+        )
     
     def get_quick_cast_enabled(self) -> bool:
         """Check if quick-cast is enabled."""
@@ -162,11 +467,11 @@ class MacroConfig:
     
     def add_auto_cast_skill(self, skill: Dict[str, Any]) -> None:
         """Add a skill to auto-cast list."""
-        if "auto_cast" not in self.settings:
-            self.settings["auto_cast"] = {}
-        if "skills" not in self.settings["auto_cast"]:
-            self.settings["auto_cast"]["skills"] = []
-        self.settings["auto_cast"]["skills"].append(skill)
+        self.add_auto_cast_skills([skill])
+    
+    def add_auto_cast_skills(self, skills: List[Dict[str, Any]]) -> None:
+        """Add several skills to auto-cast list at once."""
+        self.settings.setdefault("auto_cast", {}).setdefault("skills", []).extend(skills)
     
     def remove_auto_cast_skill(self, skill_hotkey: str) -> bool:
         """Remove a skill from auto-cast list by hotkey."""
@@ -183,9 +488,11 @@ class MacroConfig:
     
     def add_macro(self, macro: Dict[str, Any]) -> None:
         """Add a custom macro."""
-        if "macros" not in self.settings:
-            self.settings["macros"] = []
-        self.settings["macros"].append(macro)
+        self.add_macros([macro])
+    
+    def add_macros(self, macros: List[Dict[str, Any]]) -> None:
+        """Add several custom macros at once."""
+        self.settings.setdefault("macros", []).extend(macros)
     
     def remove_macro(self, macro_name: str) -> bool:
         """Remove a macro by name."""
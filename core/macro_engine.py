@@ -1,60 +1,150 @@
 # Macro engine for quick-cast, auto-cast, and custom macros
+import heapq
+import importlib.util
 import time
 import threading
-from typing import Dict, Any, Optional, Callable, List
-
-try:
-    from pynput import mouse, keyboard
-    from pynput.keyboard import Key, Controller as KeyboardController
-    from pynput.mouse import Button, Controller as MouseController
-    PYNPUT_AVAILABLE = True
-except ImportError:
-    PYNPUT_AVAILABLE = False
+from collections import deque
+from typing import Deque, Dict, Any, Optional, Callable, List, Tuple
 
 from .config import MacroConfig
-from .win_input import get_direct_input_controller, WINDOWS_AVAILABLE
+from .win_input import get_direct_input_controller, HighResTimer, WINDOWS_AVAILABLE
+
+# pynput (and its platform backend) is imported when the engine first starts
+PYNPUT_AVAILABLE = importlib.util.find_spec("pynput") is not None
+keyboard = None
+Button = None
+KeyboardController = None
+MouseController = None
+# Lowercased names of special keys (Key.f9 -> 'f9'), looked up per key press
+_SPECIAL_KEY_NAMES: Dict[Any, str] = {}
+
+
+def _import_pynput() -> bool:
+    """Import pynput on first use; returns whether it could be imported."""
+    global keyboard, Button, KeyboardController, MouseController
+    if keyboard is None:
+        if not PYNPUT_AVAILABLE:
+            return False
+        try:
+            from pynput import keyboard as keyboard_module
+            from pynput.mouse import Button as button, Controller as mouse_controller
+        except ImportError:
+            return False
+        _SPECIAL_KEY_NAMES.update({k: k.name.lower() for k in keyboard_module.Key})
+        Button = button
+        KeyboardController = keyboard_module.Controller
+        MouseController = mouse_controller
+        keyboard = keyboard_module
+    return True
+
+
+# Auto-cast waits shorter than this use the high-resolution timer; longer
+# waits stay on the stop event so stopping remains immediate
+_PRECISE_WAIT_S = 0.02
+
+
+def _no_input(*args) -> None:
+    """Input sink used when no input backend is available."""
 
 
 class MacroEngine:
     """Main engine for macro execution."""
     
+    # Fixed attribute layout keeps the per-keystroke reads on slot descriptors
+    __slots__ = (
+        'config', 'running', 'enabled', 'events',
+        'keyboard_controller', 'mouse_controller',
+        'direct_input', 'use_direct_input',
+        '_tap_key', '_tap_keys', '_press_key', '_release_key', '_click_mouse', '_action_dispatch',
+        '_build_inputs', '_send_inputs',
+        '_quick_cast_enabled', '_auto_cast_enabled',
+        '_auto_cast_thread', '_stop_auto_cast',
+        '_keyboard_listener', '_listener_ready', '_registered_hotkeys',
+        '_inflight_macros', '_inflight_lock', '_macro_cancel', '_macro_generation',
+        '_global_hotkey_lower', '_quick_cast_map', '_macro_map',
+        '_autocast_cached', '_autocast_interval_s',
+    )
+    
     def __init__(self, config: Optional[MacroConfig] = None):
         self.config = config or MacroConfig()
         self.running = False
         self.enabled = False
+        # Engine state changes made off the GUI thread (e.g. the toggle hotkey),
+        # appended by the listener and drained by the GUI in batches
+        self.events: Deque[Tuple[str, Any]] = deque(maxlen=256)
         
-        # Initialize pynput controllers for normal input
-        if PYNPUT_AVAILABLE:
-            self.keyboard_controller = KeyboardController()
-            self.mouse_controller = MouseController()
-        else:
-            self.keyboard_controller = None
-            self.mouse_controller = None
+        # pynput controllers for normal input, created by start()
+        self.keyboard_controller = None
+        self.mouse_controller = None
         
         # Initialize DirectInput controller for game compatibility (War3)
         self.direct_input = get_direct_input_controller()
         self.use_direct_input = WINDOWS_AVAILABLE  # Use DirectInput on Windows
+        self._bind_input_backend()
         
-        self._quick_cast_enabled = False
-        self._auto_cast_enabled = False
+        self._action_dispatch: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "key_press": self._act_key_press,
+            "key_sequence": self._act_key_sequence,
+            "input_batch": self._act_input_batch,
+            "key_hold": self._act_key_hold,
+            "mouse_click": self._act_mouse_click,
+            "delay": self._act_delay,
+            "combo": self._act_combo,
+        }
+        
+        # Taken from the settings in memory, like the lookup tables below, so
+        # an engine built on a loaded config already reflects it
+        self._quick_cast_enabled = self.config.get_quick_cast_enabled()
+        self._auto_cast_enabled = self.config.get_auto_cast_enabled()
         self._auto_cast_thread: Optional[threading.Thread] = None
         self._stop_auto_cast = threading.Event()
         
-        self._keyboard_listener: Optional[keyboard.Listener] = None
+        self._keyboard_listener: Optional["keyboard.Listener"] = None
+        # Set once the running listener's keyboard hook is installed
+        self._listener_ready = threading.Event()
         self._registered_hotkeys: Dict[str, Callable] = {}
-        self._macro_threads: Dict[str, threading.Thread] = {}
+        # Running macros by name, mapped to the generation they started in;
+        # touched by listener and macro threads
+        self._inflight_macros: Dict[str, int] = {}
+        self._inflight_lock = threading.Lock()
+        # Set to wake macros out of their waits; the generation bump tells
+        # them to stop even if the event is cleared again right away
+        self._macro_cancel = threading.Event()
+        self._macro_generation = 0
         
-    def start(self) -> bool:
-        """Start the macro engine."""
-        if not PYNPUT_AVAILABLE:
+        # Lookup tables rebuilt whenever settings change, keyed by lowercased hotkey
+        self._quick_cast_map: Dict[str, str] = {}
+        self._macro_map: Dict[str, Dict[str, Any]] = {}
+        self._autocast_cached: List[Dict[str, Any]] = []
+        self._global_hotkey_lower = ""
+        self._autocast_interval_s = 0.0
+        self._rebuild_lookup_tables()
+        
+    def start(self, load_settings: bool = True) -> bool:
+        """Start the macro engine.
+        
+        Args:
+            load_settings: Re-read the config file first. Callers that start
+                the engine off the thread owning the config reload it
+                themselves and pass False, so the config is never loaded
+                from two threads at once.
+        """
+        if not _import_pynput():
             return False
             
         if self.running:
             return True
+        
+        if self.keyboard_controller is None:
+            self.keyboard_controller = KeyboardController()
+            self.mouse_controller = MouseController()
+            self._bind_input_backend()
             
         self.running = True
+        self._macro_cancel.clear()
         self.enabled = True
-        self._load_settings()
+        if load_settings:
+            self._load_settings()
         self._start_keyboard_listener()
         
         if self._auto_cast_enabled:
@@ -75,10 +165,13 @@ class MacroEngine:
         if self.enabled:
             self.enabled = False
             self._stop_auto_cast_thread()
+            self._stop_all_macros()
         else:
+            self._macro_cancel.clear()
             self.enabled = True
             if self._auto_cast_enabled:
                 self._start_auto_cast_thread()
+        self.events.append(("toggled", self.enabled))
         return self.enabled
     
     def _load_settings(self) -> None:
@@ -86,10 +179,83 @@ class MacroEngine:
         self.config.load()
         self._quick_cast_enabled = self.config.get_quick_cast_enabled()
         self._auto_cast_enabled = self.config.get_auto_cast_enabled()
+        self._rebuild_lookup_tables()
+    
+    def _rebuild_lookup_tables(self) -> None:
+        """Rebuild the hotkey lookup tables used by the key press handlers."""
+        self._rebuild_quick_cast_map()
+        self._rebuild_macro_map()
+        self._rebuild_auto_cast_cache()
+        self._global_hotkey_lower = self.config.get_global_hotkey().lower()
+    
+    def _rebuild_quick_cast_map(self) -> None:
+        """Rebuild the quick-cast hotkey to skill table."""
+        self._quick_cast_map = {
+            hotkey.lower(): skill_name
+            for skill_name, hotkey in self.config.get_quick_cast_hotkeys().items()
+            if hotkey
+        }
+    
+    def _rebuild_macro_map(self) -> None:
+        """Rebuild the hotkey to compiled macro table."""
+        macro_map: Dict[str, Dict[str, Any]] = {}
+        for macro in self.config.get_macros():
+            hotkey = macro.get("hotkey", "")
+            if hotkey and hotkey.lower() not in macro_map:
+                # First macro bound to a hotkey wins
+                macro_map[hotkey.lower()] = self._compile_macro(macro, self._build_inputs)
+        self._macro_map = macro_map
+    
+    def _rebuild_auto_cast_cache(self) -> None:
+        """Rebuild the auto-cast skill list read by the auto-cast thread."""
+        interval_ms = self.config.get_auto_cast_interval()
+        # Copies with the interval pre-converted to seconds; the config keeps ms
+        self._autocast_cached = [
+            {**skill, "_interval_s": skill.get("interval_ms", interval_ms) / 1000.0}
+            for skill in self.config.get_auto_cast_skills()
+        ]
+        self._autocast_interval_s = interval_ms / 1000.0
+    
+    @staticmethod
+    def _compile_macro(macro: Dict[str, Any],
+                       build_inputs: Optional[Callable[[List[str]], Any]] = None) -> Dict[str, Any]:
+        """Copy a macro with action durations pre-converted to seconds.
+        
+        Runs of back-to-back key presses are merged into a single key_sequence
+        action so they can be sent in one batch. With build_inputs, each run is
+        instead pre-built into a ready-to-send input_batch.
+        """
+        actions: List[Dict[str, Any]] = []
+        run: List[str] = []
+        
+        def flush_run():
+            inputs = build_inputs(run) if build_inputs and run else None
+            if inputs is not None:
+                actions.append({"type": "input_batch", "keys": list(run), "_inputs": inputs})
+            elif len(run) == 1:
+                actions.append({"type": "key_press", "key": run[0]})
+            elif run:
+                actions.append({"type": "key_sequence", "keys": list(run)})
+            run.clear()
+        
+        for action in macro.get("actions", []):
+            action_type = action.get("type")
+            if action_type == "key_press":
+                if action.get("key"):
+                    run.append(action["key"])
+                continue
+            flush_run()
+            if action_type == "key_hold":
+                action = {**action, "_duration_s": action.get("duration_ms", 100) / 1000.0}
+            elif action_type == "delay":
+                action = {**action, "_delay_s": action.get("delay_ms", 100) / 1000.0}
+            actions.append(action)
+        flush_run()
+        return {**macro, "actions": actions}
     
     def _start_keyboard_listener(self) -> None:
         """Start listening for keyboard events."""
-        if not PYNPUT_AVAILABLE:
+        if not _import_pynput():
             return
             
         def on_press(key):
@@ -97,144 +263,187 @@ class MacroEngine:
                 return
             self._handle_key_press(key)
         
-        self._keyboard_listener = keyboard.Listener(on_press=on_press)
-        self._keyboard_listener.start()
+        listener = keyboard.Listener(on_press=on_press)
+        listener.start()
+        self._keyboard_listener = listener
+        # Listener.wait() has no timeout, so it runs on its own daemon thread
+        threading.Thread(target=self._signal_listener_ready, args=(listener,), daemon=True).start()
+    
+    def _signal_listener_ready(self, listener: "keyboard.Listener") -> None:
+        """Set the ready event once a listener's hook is installed."""
+        listener.wait()
+        if self._keyboard_listener is listener:
+            self._listener_ready.set()
+    
+    def wait_ready(self, timeout: Optional[float] = 1.0) -> bool:
+        """Wait until the engine is listening for hotkeys.
+        
+        Returns False if the keyboard hook is not installed within timeout
+        seconds, for example because the engine was never started.
+        """
+        return self._listener_ready.wait(timeout)
     
     def _stop_keyboard_listener(self) -> None:
         """Stop keyboard listener."""
-        if self._keyboard_listener:
-            self._keyboard_listener.stop()
-            self._keyboard_listener = None
+        listener, self._keyboard_listener = self._keyboard_listener, None
+        # After the swap a late ready signal from this listener is ignored
+        self._listener_ready.clear()
+        if listener:
+            listener.stop()
     
     def _handle_key_press(self, key) -> None:
         """Handle a key press event."""
+        # Derive the lowercased char (or special key name) once per event
         try:
-            key_char = key.char if hasattr(key, 'char') else str(key)
+            key_char = key.char.lower() if getattr(key, 'char', None) else None
         except AttributeError:
-            key_char = str(key)
+            key_char = None
+        key_name = None
+        if key_char is None:
+            key_name = _SPECIAL_KEY_NAMES.get(key)
+            if key_name is None:
+                key_name = str(key).replace('Key.', '').lower()
         
         # Check global toggle hotkey
-        global_hotkey = self.config.get_global_hotkey()
-        if self._key_matches(key, global_hotkey):
+        if key_char == self._global_hotkey_lower or key_name == self._global_hotkey_lower:
             self.toggle()
             return
         
         # Check quick-cast hotkeys
         if self._quick_cast_enabled:
-            self._handle_quick_cast(key, key_char)
+            self._handle_quick_cast(key_char)
         
         # Check custom macro hotkeys
         self._handle_macro_hotkey(key_char)
     
-    def _key_matches(self, key, hotkey: str) -> bool:
-        """Check if a key matches a hotkey string."""
-        try:
-            if hasattr(key, 'char') and key.char:
-                return key.char.lower() == hotkey.lower()
-            else:
-                key_name = str(key).replace('Key.', '').lower()
-                return key_name == hotkey.lower()
-        except AttributeError:
-            return False
-    
-    def _handle_quick_cast(self, key, key_char: str) -> None:
-        """Handle quick-cast for a key press."""
-        hotkeys = self.config.get_quick_cast_hotkeys()
-        
-        for skill_name, hotkey in hotkeys.items():
-            if key_char and key_char.lower() == hotkey.lower():
-                self._execute_quick_cast(hotkey)
-                break
+    def _handle_quick_cast(self, key_char: Optional[str]) -> None:
+        """Handle quick-cast for a lowercased key char."""
+        if key_char in self._quick_cast_map:
+            self._execute_quick_cast(key_char)
     
     def _execute_quick_cast(self, hotkey: str) -> None:
         """Execute a quick-cast action - press key and click at cursor position."""
-        # Use DirectInput for game compatibility (War3)
-        if self.use_direct_input and self.direct_input.available:
-            self.direct_input.click_mouse('left')
-        elif self.mouse_controller:
-            self.mouse_controller.click(Button.left)
+        self._click_mouse('left')
     
-    def _handle_macro_hotkey(self, key_char: str) -> None:
-        """Handle custom macro hotkey."""
-        macros = self.config.get_macros()
-        
-        for macro in macros:
-            if key_char and key_char.lower() == macro.get("hotkey", "").lower():
-                self._execute_macro(macro)
-                break
+    def _handle_macro_hotkey(self, key_char: Optional[str]) -> None:
+        """Handle custom macro hotkey for a lowercased key char."""
+        macro = self._macro_map.get(key_char)
+        if macro is not None:
+            self._execute_macro(macro)
     
     def _execute_macro(self, macro: Dict[str, Any]) -> None:
         """Execute a custom macro."""
         actions = macro.get("actions", [])
         macro_name = macro.get("name", "unnamed")
         
-        # Run macro in a separate thread
-        if macro_name in self._macro_threads:
-            # Macro already running, skip
-            return
+        with self._inflight_lock:
+            if macro_name in self._inflight_macros:
+                # Macro already running, skip
+                return
+            generation = self._macro_generation
+            self._inflight_macros[macro_name] = generation
+        
+        # Run macro in a separate daemon thread
+        execute_action = self._execute_action
         
         def run_macro():
-            for action in actions:
-                if not self.enabled:
-                    break
-                self._execute_action(action)
-            self._macro_threads.pop(macro_name, None)
+            try:
+                for action in actions:
+                    if not self.enabled or self._macro_generation != generation:
+                        break
+                    execute_action(action)
+            finally:
+                with self._inflight_lock:
+                    # A stopped run must not drop the entry of a newer run
+                    if self._inflight_macros.get(macro_name) == generation:
+                        del self._inflight_macros[macro_name]
         
-        thread = threading.Thread(target=run_macro, daemon=True)
-        self._macro_threads[macro_name] = thread
-        thread.start()
+        threading.Thread(target=run_macro, daemon=True).start()
     
     def _execute_action(self, action: Dict[str, Any]) -> None:
         """Execute a single macro action."""
-        action_type = action.get("type", "")
-        
-        if action_type == "key_press":
-            key = action.get("key", "")
-            if key:
-                # Use DirectInput for game compatibility (War3)
-                if self.use_direct_input and self.direct_input.available:
-                    self.direct_input.tap_key(key)
-                elif self.keyboard_controller:
-                    self.keyboard_controller.press(key)
-                    self.keyboard_controller.release(key)
-        
-        elif action_type == "key_hold":
-            key = action.get("key", "")
-            duration = action.get("duration_ms", 100) / 1000
-            if key:
-                if self.use_direct_input and self.direct_input.available:
-                    self.direct_input.press_key(key)
-                    time.sleep(duration)
-                    self.direct_input.release_key(key)
-                elif self.keyboard_controller:
-                    self.keyboard_controller.press(key)
-                    time.sleep(duration)
-                    self.keyboard_controller.release(key)
-        
-        elif action_type == "mouse_click":
-            button_name = action.get("button", "left")
-            if self.use_direct_input and self.direct_input.available:
-                self.direct_input.click_mouse(button_name)
-            elif self.mouse_controller:
-                button = Button.left if button_name == "left" else Button.right
-                self.mouse_controller.click(button)
-        
-        elif action_type == "delay":
-            delay_ms = action.get("delay_ms", 100)
-            time.sleep(delay_ms / 1000)
-        
-        elif action_type == "combo":
-            keys = action.get("keys", [])
-            if self.use_direct_input and self.direct_input.available:
-                for key in keys:
-                    self.direct_input.press_key(key)
-                for key in reversed(keys):
-                    self.direct_input.release_key(key)
-            elif self.keyboard_controller:
-                for key in keys:
-                    self.keyboard_controller.press(key)
-                for key in reversed(keys):
-                    self.keyboard_controller.release(key)
+        handler = self._action_dispatch.get(action.get("type", ""))
+        if handler is not None:
+            handler(action)
+    
+    def _act_key_press(self, action: Dict[str, Any]) -> None:
+        """Press and release a key."""
+        key = action.get("key", "")
+        if key:
+            self._tap_key(key)
+    
+    def _act_key_sequence(self, action: Dict[str, Any]) -> None:
+        """Press and release several keys in order as one batch."""
+        self._tap_keys(action["keys"])
+    
+    def _act_input_batch(self, action: Dict[str, Any]) -> None:
+        """Replay a pre-built DirectInput key batch."""
+        self._send_inputs(action["_inputs"])
+    
+    def _act_key_hold(self, action: Dict[str, Any]) -> None:
+        """Hold a key down for a duration."""
+        key = action.get("key", "")
+        if key:
+            self._press_key(key)
+            # Release early if macros are cancelled so the key is not left held
+            self._macro_cancel.wait(action["_duration_s"])
+            self._release_key(key)
+    
+    def _act_mouse_click(self, action: Dict[str, Any]) -> None:
+        """Click a mouse button."""
+        self._click_mouse(action.get("button", "left"))
+    
+    def _act_delay(self, action: Dict[str, Any]) -> None:
+        """Wait before the next action; returns early when macros are cancelled."""
+        self._macro_cancel.wait(action["_delay_s"])
+    
+    def _act_combo(self, action: Dict[str, Any]) -> None:
+        """Press multiple keys together."""
+        keys = action.get("keys", [])
+        for key in keys:
+            self._press_key(key)
+        for key in reversed(keys):
+            self._release_key(key)
+    
+    def _bind_input_backend(self) -> None:
+        """Bind the low-level input callables to DirectInput or pynput."""
+        if self.use_direct_input and self.direct_input.available:
+            # Use DirectInput for game compatibility (War3)
+            self._tap_key = self.direct_input.tap_key
+            self._tap_keys = self.direct_input.tap_keys
+            self._press_key = self.direct_input.press_key
+            self._release_key = self.direct_input.release_key
+            self._click_mouse = self.direct_input.click_mouse
+            self._build_inputs = self.direct_input.build_key_inputs
+            self._send_inputs = self.direct_input.send_inputs
+            return
+        elif self.keyboard_controller:
+            self._tap_key = self._pynput_tap_key
+            self._tap_keys = self._pynput_tap_keys
+            self._press_key = self.keyboard_controller.press
+            self._release_key = self.keyboard_controller.release
+            self._click_mouse = self._pynput_click_mouse
+        else:
+            self._tap_key = self._tap_keys = _no_input
+            self._press_key = self._release_key = self._click_mouse = _no_input
+        # Pre-built input batches only exist for DirectInput
+        self._build_inputs = None
+        self._send_inputs = _no_input
+    
+    def _pynput_tap_key(self, key: str) -> None:
+        """Press and release a key through pynput."""
+        self.keyboard_controller.press(key)
+        self.keyboard_controller.release(key)
+    
+    def _pynput_tap_keys(self, keys: List[str]) -> None:
+        """Press and release several keys in order through pynput."""
+        for key in keys:
+            self.keyboard_controller.press(key)
+            self.keyboard_controller.release(key)
+    
+    def _pynput_click_mouse(self, button_name: str) -> None:
+        """Click a mouse button through pynput."""
+        self.mouse_controller.click(Button.left if button_name == "left" else Button.right)
     
     def _start_auto_cast_thread(self) -> None:
         """Start the auto-cast thread."""
@@ -254,32 +463,76 @@ class MacroEngine:
     
     def _auto_cast_loop(self) -> None:
         """Main loop for auto-casting skills."""
-        interval_ms = self.config.get_auto_cast_interval()
+        stop = self._stop_auto_cast
+        timer = HighResTimer()
+        try:
+            self._run_auto_cast(stop, timer)
+        finally:
+            timer.close()
+    
+    def _run_auto_cast(self, stop: threading.Event, timer: HighResTimer) -> None:
+        """Dispatch due auto-cast skills until stopped or disabled.
+        
+        Each skill has its own due time on a min-heap; skills that come due
+        together are tapped with a single batched send.
+        """
+        skills = None
+        heap: List[tuple] = []
         
-        while not self._stop_auto_cast.is_set() and self.enabled:
-            skills = self.config.get_auto_cast_skills()
+        # Waiting on the stop event instead of sleeping lets stop() return immediately
+        while not stop.is_set() and self.enabled:
+            if skills is not self._autocast_cached:
+                # Skills changed (or first pass): restart the schedule
+                skills = self._autocast_cached
+                now = time.monotonic()
+                # A 1 ms floor keeps a zero interval from spinning the loop
+                heap = [
+                    (now, i, skill["hotkey"], max(skill["_interval_s"], 0.001))
+                    for i, skill in enumerate(skills)
+                    if skill.get("hotkey")
+                ]
+                heapq.heapify(heap)
+            
+            if not heap:
+                # Floored like the skill intervals so a 0 ms setting can't spin
+                if stop.wait(max(self._autocast_interval_s, 0.001)):
+                    return
+                continue
             
-            for skill in skills:
-                if self._stop_auto_cast.is_set() or not self.enabled:
-                    break
-                    
-                hotkey = skill.get("hotkey", "")
-                if hotkey:
-                    # Use DirectInput for game compatibility (War3)
-                    if self.use_direct_input and self.direct_input.available:
-                        self.direct_input.tap_key(hotkey)
-                    elif self.keyboard_controller:
-                        self.keyboard_controller.press(hotkey)
-                        self.keyboard_controller.release(hotkey)
-                    
-                    skill_interval = skill.get("interval_ms", interval_ms)
-                    time.sleep(skill_interval / 1000)
+            wait_s = heap[0][0] - time.monotonic()
+            if wait_s > _PRECISE_WAIT_S:
+                # Coarse wait, leaving the last stretch to the precise timer
+                if stop.wait(wait_s - _PRECISE_WAIT_S):
+                    return
+                continue
+            if wait_s > 0:
+                timer.sleep(wait_s)
+                continue
             
-            time.sleep(interval_ms / 1000)
+            now = time.monotonic()
+            due_keys = []
+            while heap and heap[0][0] <= now:
+                due, i, hotkey, interval_s = heapq.heappop(heap)
+                due_keys.append(hotkey)
+                # Skip missed slots instead of bursting to catch up
+                next_due = due + interval_s
+                if next_due <= now:
+                    next_due = now + interval_s
+                heapq.heappush(heap, (next_due, i, hotkey, interval_s))
+            
+            # Re-read per batch so backend switches still take effect
+            if len(due_keys) == 1:
+                self._tap_key(due_keys[0])
+            else:
+                self._tap_keys(due_keys)
     
     def _stop_all_macros(self) -> None:
         """Stop all running macros."""
-        self._macro_threads.clear()
+        # Running macros wake from their waits and bail out before the next action
+        with self._inflight_lock:
+            self._inflight_macros.clear()
+            self._macro_generation += 1
+        self._macro_cancel.set()
     
     # Public API methods for GUI integration
     
@@ -287,6 +540,7 @@ class MacroEngine:
         """Enable or disable quick-cast."""
         self._quick_cast_enabled = enabled
         self.config.set_quick_cast_enabled(enabled)
+        self._rebuild_lookup_tables()
     
     def set_auto_cast_enabled(self, enabled: bool) -> None:
         """Enable or disable auto-cast."""
@@ -301,6 +555,9 @@ class MacroEngine:
     def set_direct_input_enabled(self, enabled: bool) -> None:
         """Enable or disable DirectInput mode for War3 compatibility."""
         self.use_direct_input = enabled and WINDOWS_AVAILABLE
+        self._bind_input_backend()
+        # Compiled macros carry backend-specific input batches
+        self._rebuild_lookup_tables()
     
     def add_auto_cast_skill(self, hotkey: str, interval_ms: int = 100) -> None:
         """Add a skill to auto-cast."""
@@ -308,11 +565,19 @@ class MacroEngine:
             "hotkey": hotkey,
             "interval_ms": interval_ms
         }
-        self.config.add_auto_cast_skill(skill)
+        self.add_auto_cast_skills([skill])
+    
+    def add_auto_cast_skills(self, skills: List[Dict[str, Any]]) -> None:
+        """Add several auto-cast skills, rebuilding the lookup tables once."""
+        self.config.add_auto_cast_skills(skills)
+        self._rebuild_lookup_tables()
     
     def remove_auto_cast_skill(self, hotkey: str) -> bool:
         """Remove a skill from auto-cast."""
-        return self.config.remove_auto_cast_skill(hotkey)
+        removed = self.config.remove_auto_cast_skill(hotkey)
+        if removed:
+            self._rebuild_lookup_tables()
+        return removed
     
     def add_macro(self, name: str, hotkey: str, actions: List[Dict[str, Any]]) -> None:
         """Add a custom macro."""
@@ -321,11 +586,19 @@ class MacroEngine:
             "hotkey": hotkey,
             "actions": actions
         }
-        self.config.add_macro(macro)
+        self.add_macros([macro])
+    
+    def add_macros(self, macros: List[Dict[str, Any]]) -> None:
+        """Add several custom macros, rebuilding the lookup tables once."""
+        self.config.add_macros(macros)
+        self._rebuild_lookup_tables()
     
     def remove_macro(self, name: str) -> bool:
         """Remove a custom macro."""
-        return self.config.remove_macro(name)
+        removed = self.config.remove_macro(name)
+        if removed:
+            self._rebuild_lookup_tables()
+        return removed
     
     def save_settings(self) -> bool:
         """Save current settings to config file."""
@@ -334,3 +607,24 @@ class MacroEngine:
     def reload_settings(self) -> None:
         """Reload settings from config file."""
         self._load_settings()
+    
+    def apply_diff(self, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """Apply in-memory config changes, rebuilding only what they touch.
+        
+        Unlike reload_settings, the config file is not re-read; the engine
+        picks the new values up from its config, and old and new (settings
+        dicts from before and after the change) only decide which lookup
+        tables need rebuilding.
+        """
+        changed = {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+        
+        if "quick_cast" in changed:
+            self._quick_cast_enabled = self.config.get_quick_cast_enabled()
+            self._rebuild_quick_cast_map()
+        if "macros" in changed:
+            self._rebuild_macro_map()
+        if "auto_cast" in changed:
+            self._auto_cast_enabled = self.config.get_auto_cast_enabled()
+            self._rebuild_auto_cast_cache()
+        if "global_hotkey" in changed:
+            self._global_hotkey_lower = self.config.get_global_hotkey().lower()
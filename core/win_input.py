@@ -1,113 +1,164 @@
 # Windows DirectInput support for Warcraft 3 and other games
 # Uses ctypes to send low-level input that DirectX games can receive
+import ctypes
+import struct
 import sys
+import threading
 import time
-from typing import Optional
+from typing import Dict, List, Optional
 
 # Check if we're on Windows
 WINDOWS_AVAILABLE = sys.platform == 'win32'
 
+# Windows API constants
+INPUT_KEYBOARD = 1
+INPUT_MOUSE = 0
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_SCANCODE = 0x0008
+KEYEVENTF_EXTENDEDKEY = 0x0001
+
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_RIGHTDOWN = 0x0008
+MOUSEEVENTF_RIGHTUP = 0x0010
+MOUSEEVENTF_MIDDLEDOWN = 0x0020
+MOUSEEVENTF_MIDDLEUP = 0x0040
+
+CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+TIMER_ALL_ACCESS = 0x1F0003
+INFINITE = 0xFFFFFFFF
+
+
+# Structures for SendInput, with the Windows field widths spelled out so
+# the layout (and the pack offsets below) is the same on every platform
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", ctypes.c_int32),
+        ("dy", ctypes.c_int32),
+        ("mouseData", ctypes.c_uint32),
+        ("dwFlags", ctypes.c_uint32),
+        ("time", ctypes.c_uint32),
+        ("dwExtraInfo", ctypes.c_size_t)  # ULONG_PTR
+    ]
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_uint16),
+        ("wScan", ctypes.c_uint16),
+        ("dwFlags", ctypes.c_uint32),
+        ("time", ctypes.c_uint32),
+        ("dwExtraInfo", ctypes.c_size_t)  # ULONG_PTR
+    ]
+
+
+class INPUT_UNION(ctypes.Union):
+    _fields_ = [
+        ("mi", MOUSEINPUT),
+        ("ki", KEYBDINPUT),
+    ]
+
+
+class INPUT(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("union", INPUT_UNION)
+    ]
+
+
+_INPUT_SIZE = ctypes.sizeof(INPUT)
+
+# Byte offsets of the per-event fields inside INPUT. The reusable structures
+# are patched in place with struct.pack_into, bypassing the per-field
+# Structure/Union descriptors. wScan and dwFlags are contiguous; wVk is
+# left at zero since scancode events ignore it.
+_OFF_KI = INPUT.union.offset + INPUT_UNION.ki.offset + KEYBDINPUT.wScan.offset
+_OFF_MI_FLAGS = INPUT.union.offset + INPUT_UNION.mi.offset + MOUSEINPUT.dwFlags.offset
+_KEY_FIELDS = struct.Struct('<HI')
+# type, zero padding and wVk up to wScan, then wScan/dwFlags: a whole
+# keyboard event (time and dwExtraInfo stay zero) in one precompiled pack
+_KEY_INPUT = struct.Struct('<I%dxHI' % (_OFF_KI - 4))
+# Scancodes work better with games than virtual keys
+_KEY_DOWN = KEYEVENTF_SCANCODE
+_KEY_UP = KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP
+_MOUSE_FLAGS = struct.Struct('<I')
+
+# Size of the reusable keyboard batch (an even number: down/up pairs)
+_BATCH_SIZE = 128
+
+# Virtual key codes to scan codes mapping for common keys
+VK_TO_SCANCODE = {
+    # Letters (A-Z)
+    'a': 0x1E, 'b': 0x30, 'c': 0x2E, 'd': 0x20, 'e': 0x12,
+    'f': 0x21, 'g': 0x22, 'h': 0x23, 'i': 0x17, 'j': 0x24,
+    'k': 0x25, 'l': 0x26, 'm': 0x32, 'n': 0x31, 'o': 0x18,
+    'p': 0x19, 'q': 0x10, 'r': 0x13, 's': 0x1F, 't': 0x14,
+    'u': 0x16, 'v': 0x2F, 'w': 0x11, 'x': 0x2D, 'y': 0x15,
+    'z': 0x2C,
+    # Numbers (0-9)
+    '1': 0x02, '2': 0x03, '3': 0x04, '4': 0x05, '5': 0x06,
+    '6': 0x07, '7': 0x08, '8': 0x09, '9': 0x0A, '0': 0x0B,
+    # Function keys
+    'f1': 0x3B, 'f2': 0x3C, 'f3': 0x3D, 'f4': 0x3E,
+    'f5': 0x3F, 'f6': 0x40, 'f7': 0x41, 'f8': 0x42,
+    'f9': 0x43, 'f10': 0x44, 'f11': 0x57, 'f12': 0x58,
+    # Special keys
+    'space': 0x39, 'enter': 0x1C, 'escape': 0x01, 'esc': 0x01,
+    'tab': 0x0F, 'backspace': 0x0E, 'shift': 0x2A, 'ctrl': 0x1D,
+    'alt': 0x38, 'capslock': 0x3A,
+    # Numpad
+    'numpad0': 0x52, 'numpad1': 0x4F, 'numpad2': 0x50, 'numpad3': 0x51,
+    'numpad4': 0x4B, 'numpad5': 0x4C, 'numpad6': 0x4D, 'numpad7': 0x47,
+    'numpad8': 0x48, 'numpad9': 0x49,
+}
+
+# ASCII-indexed scancode table for single-character keys, the common hotkey
+# case. Uppercase letters share the lowercase entries so lookups skip
+# .lower(). A zero scancode means "not in the table".
+_SC_TABLE = bytearray(128)
+for _name, _sc in VK_TO_SCANCODE.items():
+    if len(_name) == 1:
+        _c = ord(_name)
+        _SC_TABLE[_c] = _sc
+        if _name.isalpha():
+            _SC_TABLE[_c - 0x20] = _sc
+del _name, _sc, _c
+
 if WINDOWS_AVAILABLE:
-    import ctypes
     from ctypes import wintypes
     
-    # Windows API constants
-    INPUT_KEYBOARD = 1
-    INPUT_MOUSE = 0
-    KEYEVENTF_KEYUP = 0x0002
-    KEYEVENTF_SCANCODE = 0x0008
-    KEYEVENTF_EXTENDEDKEY = 0x0001
-    
-    MOUSEEVENTF_LEFTDOWN = 0x0002
-    MOUSEEVENTF_LEFTUP = 0x0004
-    MOUSEEVENTF_RIGHTDOWN = 0x0008
-    MOUSEEVENTF_RIGHTUP = 0x0010
-    MOUSEEVENTF_MIDDLEDOWN = 0x0020
-    MOUSEEVENTF_MIDDLEUP = 0x0040
-    
-    # Structures for SendInput
-    class MOUSEINPUT(ctypes.Structure):
-        _fields_ = [
-            ("dx", wintypes.LONG),
-            ("dy", wintypes.LONG),
-            ("mouseData", wintypes.DWORD),
-            ("dwFlags", wintypes.DWORD),
-            ("time", wintypes.DWORD),
-            ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
-        ]
-    
-    class KEYBDINPUT(ctypes.Structure):
-        _fields_ = [
-            ("wVk", wintypes.WORD),
-            ("wScan", wintypes.WORD),
-            ("dwFlags", wintypes.DWORD),
-            ("time", wintypes.DWORD),
-            ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
-        ]
-    
-    class INPUT_UNION(ctypes.Union):
-        _fields_ = [
-            ("mi", MOUSEINPUT),
-            ("ki", KEYBDINPUT),
-        ]
-    
-    class INPUT(ctypes.Structure):
-        _fields_ = [
-            ("type", wintypes.DWORD),
-            ("union", INPUT_UNION)
-        ]
-    
-    # Virtual key codes to scan codes mapping for common keys
-    VK_TO_SCANCODE = {
-        # Letters (A-Z)
-        'a': 0x1E, 'b': 0x30, 'c': 0x2E, 'd': 0x20, 'e': 0x12,
-        'f': 0x21, 'g': 0x22, 'h': 0x23, 'i': 0x17, 'j': 0x24,
-        'k': 0x25, 'l': 0x26, 'm': 0x32, 'n': 0x31, 'o': 0x18,
-        'p': 0x19, 'q': 0x10, 'r': 0x13, 's': 0x1F, 't': 0x14,
-        'u': 0x16, 'v': 0x2F, 'w': 0x11, 'x': 0x2D, 'y': 0x15,
-        'z': 0x2C,
-        # Numbers (0-9)
-        '1': 0x02, '2': 0x03, '3': 0x04, '4': 0x05, '5': 0x06,
-        '6': 0x07, '7': 0x08, '8': 0x09, '9': 0x0A, '0': 0x0B,
-        # Function keys
-        'f1': 0x3B, 'f2': 0x3C, 'f3': 0x3D, 'f4': 0x3E,
-        'f5': 0x3F, 'f6': 0x40, 'f7': 0x41, 'f8': 0x42,
-        'f9': 0x43, 'f10': 0x44, 'f11': 0x57, 'f12': 0x58,
-        # Special keys
-        'space': 0x39, 'enter': 0x1C, 'escape': 0x01, 'esc': 0x01,
-        'tab': 0x0F, 'backspace': 0x0E, 'shift': 0x2A, 'ctrl': 0x1D,
-        'alt': 0x38, 'capslock': 0x3A,
-        # Numpad
-        'numpad0': 0x52, 'numpad1': 0x4F, 'numpad2': 0x50, 'numpad3': 0x51,
-        'numpad4': 0x4B, 'numpad5': 0x4C, 'numpad6': 0x4D, 'numpad7': 0x47,
-        'numpad8': 0x48, 'numpad9': 0x49,
-    }
-    
-    # Virtual key codes
-    VK_CODES = {
-        # Letters (A-Z)
-        'a': 0x41, 'b': 0x42, 'c': 0x43, 'd': 0x44, 'e': 0x45,
-        'f': 0x46, 'g': 0x47, 'h': 0x48, 'i': 0x49, 'j': 0x4A,
-        'k': 0x4B, 'l': 0x4C, 'm': 0x4D, 'n': 0x4E, 'o': 0x4F,
-        'p': 0x50, 'q': 0x51, 'r': 0x52, 's': 0x53, 't': 0x54,
-        'u': 0x55, 'v': 0x56, 'w': 0x57, 'x': 0x58, 'y': 0x59,
-        'z': 0x5A,
-        # Numbers (0-9)
-        '1': 0x31, '2': 0x32, '3': 0x33, '4': 0x34, '5': 0x35,
-        '6': 0x36, '7': 0x37, '8': 0x38, '9': 0x39, '0': 0x30,
-        # Function keys
-        'f1': 0x70, 'f2': 0x71, 'f3': 0x72, 'f4': 0x73,
-        'f5': 0x74, 'f6': 0x75, 'f7': 0x76, 'f8': 0x77,
-        'f9': 0x78, 'f10': 0x79, 'f11': 0x7A, 'f12': 0x7B,
-        # Special keys
-        'space': 0x20, 'enter': 0x0D, 'escape': 0x1B, 'esc': 0x1B,
-        'tab': 0x09, 'backspace': 0x08, 'shift': 0x10, 'ctrl': 0x11,
-        'alt': 0x12, 'capslock': 0x14,
-        # Numpad
-        'numpad0': 0x60, 'numpad1': 0x61, 'numpad2': 0x62, 'numpad3': 0x63,
-        'numpad4': 0x64, 'numpad5': 0x65, 'numpad6': 0x66, 'numpad7': 0x67,
-        'numpad8': 0x68, 'numpad9': 0x69,
-    }
+    # Resolve and prototype the user32 entry points once instead of going
+    # through windll attribute lookup and argument inference on every call
+    _user32 = ctypes.WinDLL('user32', use_last_error=False)
+    
+    _SendInput = _user32.SendInput
+    _SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+    _SendInput.restype = wintypes.UINT
+    
+    _MapVirtualKeyW = _user32.MapVirtualKeyW
+    _MapVirtualKeyW.argtypes = [wintypes.UINT, wintypes.UINT]
+    _MapVirtualKeyW.restype = wintypes.UINT
+    
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=False)
+    
+    _CreateWaitableTimerExW = _kernel32.CreateWaitableTimerExW
+    _CreateWaitableTimerExW.argtypes = [wintypes.LPVOID, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD]
+    _CreateWaitableTimerExW.restype = wintypes.HANDLE
+    
+    _SetWaitableTimer = _kernel32.SetWaitableTimer
+    _SetWaitableTimer.argtypes = [
+        wintypes.HANDLE, ctypes.POINTER(wintypes.LARGE_INTEGER), wintypes.LONG,
+        wintypes.LPVOID, wintypes.LPVOID, wintypes.BOOL,
+    ]
+    _SetWaitableTimer.restype = wintypes.BOOL
+    
+    _WaitForSingleObject = _kernel32.WaitForSingleObject
+    _WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+    _WaitForSingleObject.restype = wintypes.DWORD
+    
+    _CloseHandle = _kernel32.CloseHandle
+    _CloseHandle.argtypes = [wintypes.HANDLE]
+    _CloseHandle.restype = wintypes.BOOL
 
 
 class DirectInputController:
@@ -116,74 +167,201 @@ class DirectInputController:
     This is compatible with DirectX games like Warcraft 3.
     """
     
-    def __init__(self):
+    # Fixed attribute layout for the structures read on every send
+    __slots__ = (
+        'available', 'min_hold_s', '_send_lock', '_resolved',
+        '_kb_inp', '_kb_pair', '_ms_pair', '_batch',
+        '_kb_ref', '_kb_pair_p', '_ms_pair_p', '_batch_p',
+    )
+    
+    def __init__(self, min_hold_s: float = 0.0):
         self.available = WINDOWS_AVAILABLE
+        # Shortest time taps and clicks hold the key or button down; see tap_key
+        self.min_hold_s = min_hold_s
+        if not self.available:
+            return
         
-    def press_key(self, key: str) -> bool:
-        """Press a key down."""
+        # Reusable INPUT structures; only the per-event fields change between
+        # sends. The lock keeps auto-cast and macro threads from interleaving
+        # writes to the shared structures.
+        self._send_lock = threading.Lock()
+        # Per-key cache of resolved scancodes, None for unknown keys
+        self._resolved: Dict[str, Optional[int]] = {}
+        
+        self._kb_inp = INPUT()
+        self._kb_inp.type = INPUT_KEYBOARD
+        
+        # Down+up pairs queued atomically by a single SendInput call
+        self._kb_pair = (INPUT * 2)()
+        for inp in self._kb_pair:
+            inp.type = INPUT_KEYBOARD
+        
+        self._ms_pair = (INPUT * 2)()
+        for inp in self._ms_pair:
+            inp.type = INPUT_MOUSE
+        
+        # Pool for tap_keys; longer sequences are sent in several chunks
+        self._batch = (INPUT * _BATCH_SIZE)()
+        for inp in self._batch:
+            inp.type = INPUT_KEYBOARD
+        
+        # SendInput arguments made once, so sends skip the per-call conversion
+        input_p = ctypes.POINTER(INPUT)
+        self._kb_ref = ctypes.byref(self._kb_inp)
+        self._kb_pair_p = ctypes.cast(self._kb_pair, input_p)
+        self._ms_pair_p = ctypes.cast(self._ms_pair, input_p)
+        self._batch_p = ctypes.cast(self._batch, input_p)
+        
+    def _resolve_key(self, key: str) -> Optional[int]:
+        """Resolve a key name to its scancode."""
+        if len(key) == 1:
+            c = ord(key)
+            if c < 128 and _SC_TABLE[c]:
+                return _SC_TABLE[c]
+        
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        
+        name = key.lower()
+        scancode = VK_TO_SCANCODE.get(name)
+        
+        if scancode is None and len(name) == 1:
+            # If not in mapping, ask Windows for the character's scancode;
+            # 0 means it has none
+            scancode = _MapVirtualKeyW(ord(name.upper()), 0) or None
+        
+        self._resolved[key] = scancode
+        return scancode
+    
+    def send_inputs(self, inputs) -> bool:
+        """Send an array of INPUT structures with a single SendInput call."""
+        if not self.available or not len(inputs):
+            return False
+        sent = _SendInput(len(inputs), inputs, _INPUT_SIZE)
+        return sent == len(inputs)
+    
+    def _send_key(self, key: str, flags: int) -> bool:
+        """Send a single key event with the given scancode flags."""
         if not self.available:
             return False
         
-        key = key.lower()
-        scancode = VK_TO_SCANCODE.get(key)
-        vk = VK_CODES.get(key)
+        scancode = self._resolve_key(key)
+        if scancode is None:
+            return False
         
+        with self._send_lock:
+            _KEY_FIELDS.pack_into(self._kb_inp, _OFF_KI, scancode, flags)
+            _SendInput(1, self._kb_ref, _INPUT_SIZE)
+        return True
+    
+    def _send_pair(self, key: str) -> bool:
+        """Send a key press and release together in one SendInput call."""
+        if not self.available:
+            return False
+        
+        scancode = self._resolve_key(key)
         if scancode is None:
-            # If not in mapping, try single character
-            if len(key) == 1:
-                vk = ord(key.upper())
-                scancode = ctypes.windll.user32.MapVirtualKeyW(vk, 0)
-            else:
-                return False
-        
-        # Create input structure with scancode (works better with games)
-        inp = INPUT()
-        inp.type = INPUT_KEYBOARD
-        inp.union.ki.wVk = vk if vk else 0
-        inp.union.ki.wScan = scancode
-        inp.union.ki.dwFlags = KEYEVENTF_SCANCODE
-        inp.union.ki.time = 0
-        inp.union.ki.dwExtraInfo = ctypes.pointer(wintypes.ULONG(0))
-        
-        ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
+            return False
+        
+        with self._send_lock:
+            pair = self._kb_pair
+            _KEY_FIELDS.pack_into(pair, _OFF_KI, scancode, _KEY_DOWN)
+            _KEY_FIELDS.pack_into(pair, _INPUT_SIZE + _OFF_KI, scancode, _KEY_UP)
+            _SendInput(2, self._kb_pair_p, _INPUT_SIZE)
         return True
     
+    def press_key(self, key: str) -> bool:
+        """Press a key down."""
+        return self._send_key(key, _KEY_DOWN)
+    
     def release_key(self, key: str) -> bool:
         """Release a key."""
-        if not self.available:
+        return self._send_key(key, _KEY_UP)
+    
+    def tap_key(self, key: str, duration: float = 0.0) -> bool:
+        """Press and release a key.
+        
+        The key is held down for duration, or min_hold_s if that is longer.
+        With no hold the press and release are queued together by one
+        SendInput call, which is fastest but zero-length: games that poll
+        key state rather than read input events can miss such a tap. Setting
+        min_hold_s to a few milliseconds trades that latency for taps every
+        game sees.
+        """
+        hold = max(duration, self.min_hold_s)
+        if hold <= 0:
+            return self._send_pair(key)
+        if not self._send_key(key, _KEY_DOWN):
             return False
+        time.sleep(hold)
+        return self._send_key(key, _KEY_UP)
+    
+    def build_key_inputs(self, keys: List[str]):
+        """Build an INPUT array pressing and releasing each key in order.
         
-        key = key.lower()
-        scancode = VK_TO_SCANCODE.get(key)
-        vk = VK_CODES.get(key)
+        The array can be kept and replayed with send_inputs, which sends its
+        events back to back whatever min_hold_s is. Unknown keys are skipped;
+        returns None if no key could be resolved.
+        """
+        if not self.available:
+            return None
         
-        if scancode is None:
-            if len(key) == 1:
-                vk = ord(key.upper())
-                scancode = ctypes.windll.user32.MapVirtualKeyW(vk, 0)
-            else:
-                return False
-        
-        inp = INPUT()
-        inp.type = INPUT_KEYBOARD
-        inp.union.ki.wVk = vk if vk else 0
-        inp.union.ki.wScan = scancode
-        inp.union.ki.dwFlags = KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP
-        inp.union.ki.time = 0
-        inp.union.ki.dwExtraInfo = ctypes.pointer(wintypes.ULONG(0))
-        
-        ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
-        return True
+        scancodes = [sc for sc in map(self._resolve_key, keys) if sc is not None]
+        if not scancodes:
+            return None
+        
+        inputs = (INPUT * (2 * len(scancodes)))()
+        offset = 0
+        for scancode in scancodes:
+            _KEY_INPUT.pack_into(inputs, offset, INPUT_KEYBOARD, scancode, _KEY_DOWN)
+            _KEY_INPUT.pack_into(inputs, offset + _INPUT_SIZE, INPUT_KEYBOARD, scancode, _KEY_UP)
+            offset += 2 * _INPUT_SIZE
+        return inputs
     
-    def tap_key(self, key: str, duration: float = 0.01) -> bool:
-        """Press and release a key."""
-        if not self.press_key(key):
+    def tap_keys(self, keys: List[str]) -> bool:
+        """Press and release a sequence of keys with a single SendInput call.
+        
+        The events are written into a preallocated pool; sequences longer than
+        the pool go out in several calls. Unknown keys are skipped. Returns
+        False if no key could be sent. With a min_hold_s the keys are tapped
+        one at a time instead, each held down as in tap_key.
+        """
+        if not self.available:
             return False
-        time.sleep(duration)
-        return self.release_key(key)
+        
+        if self.min_hold_s > 0:
+            return any([self.tap_key(key) for key in keys])
+        
+        scancodes = [sc for sc in map(self._resolve_key, keys) if sc is not None]
+        if not scancodes:
+            return False
+        
+        ok = True
+        with self._send_lock:
+            batch = self._batch
+            count = 0
+            for scancode in scancodes:
+                offset = count * _INPUT_SIZE + _OFF_KI
+                _KEY_FIELDS.pack_into(batch, offset, scancode, _KEY_DOWN)
+                _KEY_FIELDS.pack_into(batch, offset + _INPUT_SIZE, scancode, _KEY_UP)
+                count += 2
+                if count == _BATCH_SIZE:
+                    ok = _SendInput(count, self._batch_p, _INPUT_SIZE) == count and ok
+                    count = 0
+            if count:
+                ok = _SendInput(count, self._batch_p, _INPUT_SIZE) == count and ok
+        return ok
+    
+    def _send_mouse(self, flags: int) -> None:
+        """Send a single mouse button event."""
+        with self._send_lock:
+            _MOUSE_FLAGS.pack_into(self._ms_pair, _OFF_MI_FLAGS, flags)
+            _SendInput(1, self._ms_pair_p, _INPUT_SIZE)
     
     def click_mouse(self, button: str = 'left') -> bool:
-        """Click a mouse button."""
+        """Click a mouse button, holding it down for min_hold_s as in tap_key."""
         if not self.available:
             return False
         
@@ -199,48 +377,89 @@ class DirectInputController:
         else:
             return False
         
-        # Mouse down
-        inp = INPUT()
-        inp.type = INPUT_MOUSE
-        inp.union.mi.dx = 0
-        inp.union.mi.dy = 0
-        inp.union.mi.mouseData = 0
-        inp.union.mi.dwFlags = down_flag
-        inp.union.mi.time = 0
-        inp.union.mi.dwExtraInfo = ctypes.pointer(wintypes.ULONG(0))
-        ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
-        
-        time.sleep(0.01)
+        hold = self.min_hold_s
+        if hold > 0:
+            self._send_mouse(down_flag)
+            time.sleep(hold)
+            self._send_mouse(up_flag)
+            return True
         
-        # Mouse up
-        inp.union.mi.dwFlags = up_flag
-        ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
+        # Mouse down and up in one call
+        with self._send_lock:
+            pair = self._ms_pair
+            _MOUSE_FLAGS.pack_into(pair, _OFF_MI_FLAGS, down_flag)
+            _MOUSE_FLAGS.pack_into(pair, _INPUT_SIZE + _OFF_MI_FLAGS, up_flag)
+            _SendInput(2, self._ms_pair_p, _INPUT_SIZE)
         
         return True
 
 
+class HighResTimer:
+    """
+    Sleep timer with sub-millisecond resolution on Windows 10 1803+.
+    Falls back to time.sleep elsewhere. Each thread should use its own timer.
+    """
+    
+    __slots__ = ('_handle',)
+    
+    def __init__(self):
+        self._handle = None
+        if WINDOWS_AVAILABLE:
+            self._handle = _CreateWaitableTimerExW(
+                None, None, CREATE_WAITABLE_TIMER_HIGH_RESOLUTION, TIMER_ALL_ACCESS
+            ) or None
+    
+    def sleep(self, seconds: float) -> None:
+        """Block the calling thread for the given number of seconds."""
+        if self._handle is None:
+            time.sleep(seconds)
+            return
+        
+        # Negative due time means relative, in 100 ns units
+        due = wintypes.LARGE_INTEGER(-int(seconds * 10_000_000))
+        if not _SetWaitableTimer(self._handle, ctypes.byref(due), 0, None, None, False):
+            time.sleep(seconds)
+            return
+        _WaitForSingleObject(self._handle, INFINITE)
+    
+    def close(self) -> None:
+        """Release the timer handle."""
+        if self._handle is not None:
+            _CloseHandle(self._handle)
+            self._handle = None
+
+
+def _return_false(*args, **kwargs) -> bool:
+    """No-op used for FallbackController operations."""
+    return False
+
+
+def _return_none(*args, **kwargs) -> None:
+    """No-op used for FallbackController builders."""
+    return None
+
+
 # Fallback controller for non-Windows systems
 class FallbackController:
     """Fallback controller that does nothing (for non-Windows systems)."""
     
+    __slots__ = ('available',)
+    
     def __init__(self):
         self.available = False
     
-    def press_key(self, key: str) -> bool:
-        return False
-    
-    def release_key(self, key: str) -> bool:
-        return False
-    
-    def tap_key(self, key: str, duration: float = 0.01) -> bool:
-        return False
-    
-    def click_mouse(self, button: str = 'left') -> bool:
-        return False
+    # Every operation shares one no-op instead of a method per call site
+    press_key = release_key = tap_key = tap_keys = staticmethod(_return_false)
+    send_inputs = click_mouse = staticmethod(_return_false)
+    build_key_inputs = staticmethod(_return_none)
+
+
+_controller = None
 
 
 def get_direct_input_controller():
-    """Get the appropriate DirectInput controller for the current platform."""
-    if WINDOWS_AVAILABLE:
-        return DirectInputController()
-    return FallbackController()
+    """Get the shared DirectInput controller for the current platform."""
+    global _controller
+    if _controller is None:
+        _controller = DirectInputController() if WINDOWS_AVAILABLE else FallbackController()
+    return _controller
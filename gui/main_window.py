@@ -1,40 +1,64 @@
 # Main GUI window for Dota Imba Macro Tool
+import copy
+import functools
 import sys
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple
 
 try:
     from PyQt5.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
         QTabWidget, QGroupBox, QLabel, QLineEdit, QPushButton, 
-        QCheckBox, QSpinBox, QListWidget, QListWidgetItem, QMessageBox,
+        QCheckBox, QSpinBox, QListWidget, QListWidgetItem, QListView, QMessageBox,
         QFormLayout, QFrame, QComboBox, QGridLayout, QDialog
     )
-    from PyQt5.QtCore import Qt, QTimer
+    from PyQt5.QtCore import (
+        Qt, QTimer, QObject, QRunnable, QSignalBlocker, QThreadPool, pyqtSignal
+    )
     from PyQt5.QtGui import QFont, QKeyEvent
     PYQT_AVAILABLE = True
 except ImportError:
     PYQT_AVAILABLE = False
 
-from core import MacroConfig, MacroEngine
+from core import ConfigSnapshot, MacroConfig, MacroEngine
+
+
+# Static styles for the whole application, parsed once in run_app
+APP_STYLESHEET = """
+    QLabel#instruction { font-size: 13px; color: #3498db; padding: 5px; }
+    QLabel#hint { color: #888; font-size: 11px; }
+    QGroupBox#slotGroup { font-weight: bold; font-size: 14px; }
+    QLabel[slotType="skill"] { font-weight: bold; color: #2c3e50; }
+    QLabel[slotType="item"] { font-weight: bold; color: #d4af37; }
+"""
 
 
 class HotkeyButton(QPushButton):
     """A button that captures keyboard input for hotkey assignment."""
     
-    def __init__(self, slot_name: str, slot_type: str, parent=None):
-        super().__init__(parent)
-        self.slot_name = slot_name
-        self.slot_type = slot_type  # 'skill' or 'item'
-        self.hotkey = ""
-        self.capturing = False
-        self.setFocusPolicy(Qt.StrongFocus)
-        self._update_display()
-        self.setMinimumSize(60, 60)
-        self.setStyleSheet(self._get_normal_style())
-        
-    def _get_normal_style(self) -> str:
-        """Get normal button style."""
-        return """
+    # Python-side fields read on every key press while capturing
+    __slots__ = ('slot_name', 'slot_type', 'hotkey', 'capturing', '_applied_style')
+    
+    # (slot_name, slot_type, hotkey) when a hotkey is assigned
+    hotkey_changed = pyqtSignal(str, str, str)
+    # (slot_name, slot_type) when the hotkey is cleared with Backspace
+    hotkey_cleared = pyqtSignal(str, str)
+    
+    # Non-printable keys that can be assigned as hotkeys
+    _SPECIAL_KEYS = {
+        Qt.Key_F1: 'f1', Qt.Key_F2: 'f2', Qt.Key_F3: 'f3', Qt.Key_F4: 'f4',
+        Qt.Key_F5: 'f5', Qt.Key_F6: 'f6', Qt.Key_F7: 'f7', Qt.Key_F8: 'f8',
+        Qt.Key_F9: 'f9', Qt.Key_F10: 'f10', Qt.Key_F11: 'f11', Qt.Key_F12: 'f12',
+        Qt.Key_Space: 'space', Qt.Key_Tab: 'tab',
+    }
+    
+    # Fixed texts for the capturing and unassigned states
+    _TXT_CAPTURING = "Bấm phím\nbất kỳ..."
+    _TIP_CAPTURING = "Bấm phím bất kỳ để chọn hotkey\n(Bấm Backspace để xoá hotkey)"
+    _TXT_EMPTY = "---"
+    _TIP_EMPTY = "Click để gán hotkey"
+    
+    # Normal button style
+    _NORMAL_STYLE = """
             QPushButton {
                 background-color: #2c3e50;
                 color: white;
@@ -49,9 +73,8 @@ class HotkeyButton(QPushButton):
             }
         """
     
-    def _get_capturing_style(self) -> str:
-        """Get capturing mode button style."""
-        return """
+    # Capturing mode button style
+    _CAPTURING_STYLE = """
             QPushButton {
                 background-color: #e74c3c;
                 color: white;
@@ -62,20 +85,38 @@ class HotkeyButton(QPushButton):
             }
         """
     
+    def __init__(self, slot_name: str, slot_type: str, parent=None):
+        super().__init__(parent)
+        self.slot_name = slot_name
+        self.slot_type = slot_type  # 'skill' or 'item'
+        self.hotkey = ""
+        self.capturing = False
+        # Style currently applied; re-parsing a stylesheet is only done on change
+        self._applied_style: Optional[str] = None
+        self.setFocusPolicy(Qt.StrongFocus)
+        self._update_display()
+        self.setMinimumSize(60, 60)
+        
+    def _apply_style(self, style: str) -> None:
+        """Apply a stylesheet unless it is already the current one."""
+        if style is not self._applied_style:
+            self._applied_style = style
+            self.setStyleSheet(style)
+    
     def _update_display(self) -> None:
         """Update button display text."""
         if self.capturing:
-            self.setText("Bấm phím\nbất kỳ...")
-            self.setToolTip("Bấm phím bất kỳ để chọn hotkey\n(Bấm Backspace để xoá hotkey)")
-            self.setStyleSheet(self._get_capturing_style())
+            self.setText(self._TXT_CAPTURING)
+            self.setToolTip(self._TIP_CAPTURING)
+            self._apply_style(self._CAPTURING_STYLE)
         elif self.hotkey:
             self.setText(self.hotkey.upper())
             self.setToolTip(f"Hotkey: {self.hotkey}\nClick để thay đổi")
-            self.setStyleSheet(self._get_normal_style())
+            self._apply_style(self._NORMAL_STYLE)
         else:
-            self.setText("---")
-            self.setToolTip("Click để gán hotkey")
-            self.setStyleSheet(self._get_normal_style())
+            self.setText(self._TXT_EMPTY)
+            self.setToolTip(self._TIP_EMPTY)
+            self._apply_style(self._NORMAL_STYLE)
     
     def set_hotkey(self, hotkey: str) -> None:
         """Set the hotkey value."""
@@ -111,9 +152,7 @@ class HotkeyButton(QPushButton):
         if key == Qt.Key_Backspace:
             self.hotkey = ""
             self.stop_capturing()
-            main_window = self._find_main_window()
-            if main_window:
-                main_window._on_hotkey_cleared(self.slot_name, self.slot_type)
+            self.hotkey_cleared.emit(self.slot_name, self.slot_type)
             return
         
         # Handle escape to cancel
@@ -121,38 +160,26 @@ class HotkeyButton(QPushButton):
             self.stop_capturing()
             return
         
+        # Letters and digits: the Qt key code is the uppercase ASCII code
+        if Qt.Key_A <= key <= Qt.Key_Z or Qt.Key_0 <= key <= Qt.Key_9:
+            self.hotkey = chr(key).lower()
+            self.stop_capturing()
+            self.hotkey_changed.emit(self.slot_name, self.slot_type, self.hotkey)
+            return
+        
         # Get key text
         key_text = event.text()
         if key_text and key_text.isprintable():
             self.hotkey = key_text.lower()
             self.stop_capturing()
-            # Emit signal to parent
-            main_window = self._find_main_window()
-            if main_window:
-                main_window._on_hotkey_changed(self.slot_name, self.slot_type, self.hotkey)
+            self.hotkey_changed.emit(self.slot_name, self.slot_type, self.hotkey)
         else:
             # Handle special keys
-            key_map = {
-                Qt.Key_F1: 'f1', Qt.Key_F2: 'f2', Qt.Key_F3: 'f3', Qt.Key_F4: 'f4',
-                Qt.Key_F5: 'f5', Qt.Key_F6: 'f6', Qt.Key_F7: 'f7', Qt.Key_F8: 'f8',
-                Qt.Key_F9: 'f9', Qt.Key_F10: 'f10', Qt.Key_F11: 'f11', Qt.Key_F12: 'f12',
-                Qt.Key_Space: 'space', Qt.Key_Tab: 'tab',
-            }
-            if key in key_map:
-                self.hotkey = key_map[key]
+            mapped = self._SPECIAL_KEYS.get(key)
+            if mapped is not None:
+                self.hotkey = mapped
                 self.stop_capturing()
-                main_window = self._find_main_window()
-                if main_window:
-                    main_window._on_hotkey_changed(self.slot_name, self.slot_type, self.hotkey)
-    
-    def _find_main_window(self):
-        """Find the main window parent."""
-        parent = self.parent()
-        while parent:
-            if isinstance(parent, MainWindow):
-                return parent
-            parent = parent.parent()
-        return None
+                self.hotkey_changed.emit(self.slot_name, self.slot_type, self.hotkey)
     
     def focusOutEvent(self, event) -> None:
         """Handle focus out to stop capturing."""
@@ -161,6 +188,33 @@ class HotkeyButton(QPushButton):
         super().focusOutEvent(event)
 
 
+class _EngineJobSignals(QObject):
+    """Signals of an _EngineJob; a QRunnable cannot emit them itself."""
+    
+    # Whether the engine call succeeded, and the error it raised if any
+    finished = pyqtSignal(bool, str)
+
+
+class _EngineJob(QRunnable):
+    """Run an engine start or stop on a pool thread."""
+    
+    def __init__(self, call: Callable[[], Optional[bool]]):
+        super().__init__()
+        self.call = call
+        self.signals = _EngineJobSignals()
+        
+    def run(self) -> None:
+        # Always report back exactly once, or the toggle button stays disabled
+        ok, error = False, ""
+        try:
+            # stop() returns None, which counts as success
+            ok = self.call() is not False
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            self.signals.finished.emit(ok, error)
+
+
 class MainWindow(QMainWindow):
     """Main application window for Dota Imba Macro Tool."""
     
@@ -170,12 +224,36 @@ class MainWindow(QMainWindow):
         self.config.load()
         self.engine = MacroEngine(self.config)
         
-        self.skill_buttons: Dict[str, HotkeyButton] = {}
-        self.item_buttons: Dict[str, HotkeyButton] = {}
+        # Hotkey buttons of every skill and item slot, by (slot type, slot key)
+        self.buttons: Dict[Tuple[str, str], HotkeyButton] = {}
+        # Settings as last loaded or saved; lets Save skip unchanged settings
+        self._saved_settings: Dict[str, Any] = {}
+        # Tabs not yet built, by index, with their builder and settings loader
+        self._pending_tabs: Dict[int, Tuple[Callable[[QWidget], None], Callable[[ConfigSnapshot], None]]] = {}
+        # Settings loaders of the lazily built tabs that exist so far
+        self._tab_loaders: List[Callable[[ConfigSnapshot], None]] = []
+        self.global_hotkey: Optional[QLineEdit] = None
+        # Engine start or stop running off the GUI thread, if any
+        self._engine_job: Optional[_EngineJob] = None
         
         self._setup_ui()
         self._load_settings()
         
+        # Drain engine events in one pass per tick rather than one signal each
+        self._event_timer = QTimer(self)
+        self._event_timer.timeout.connect(self._drain_engine_events)
+        self._event_timer.start(50)
+        
+        # Restores the engine status after a transient message
+        self._toast_timer = QTimer(self)
+        self._toast_timer.setSingleShot(True)
+        self._toast_timer.timeout.connect(self._refresh_status)
+        
+        # Coalesces a burst of hotkey edits into one save and engine reload
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush_config)
+        
     def _setup_ui(self) -> None:
         """Setup the main UI."""
         self.setWindowTitle("Dota Imba Macro Tool - War3 Compatible")
@@ -193,11 +271,18 @@ class MainWindow(QMainWindow):
         self.tab_widget = QTabWidget()
         main_layout.addWidget(self.tab_widget)
         
-        # Create tabs
+        # Create tabs; only the hotkey tab is built up front, the others are
+        # built the first time they are opened
         self._create_hotkey_tab()
-        self._create_auto_cast_tab()
-        self._create_macro_tab()
-        self._create_settings_tab()
+        lazy_tabs = (
+            ("🔄 Auto-Cast", self._create_auto_cast_tab, self._load_auto_cast_settings),
+            ("📝 Macros", self._create_macro_tab, self._load_macro_settings),
+            ("⚙️ Settings", self._create_settings_tab, self._load_general_settings),
+        )
+        for title, builder, loader in lazy_tabs:
+            index = self.tab_widget.addTab(QWidget(), title)
+            self._pending_tabs[index] = (builder, loader)
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
         
         # Bottom buttons
         self._create_bottom_buttons(main_layout)
@@ -230,13 +315,13 @@ class MainWindow(QMainWindow):
         instruction_label = QLabel(
             "🎮 Click vào ô để gán hotkey. Bấm Backspace để xoá hotkey."
         )
-        instruction_label.setStyleSheet("font-size: 13px; color: #3498db; padding: 5px;")
+        instruction_label.setObjectName("instruction")
         instruction_label.setWordWrap(True)
         layout.addWidget(instruction_label)
         
         # Skills section (2x4 grid = 8 skills)
         skills_group = QGroupBox("⚡ Skills (2x4)")
-        skills_group.setStyleSheet("QGroupBox { font-weight: bold; font-size: 14px; }")
+        skills_group.setObjectName("slotGroup")
         skills_layout = QGridLayout(skills_group)
         skills_layout.setSpacing(10)
         
@@ -246,33 +331,14 @@ class MainWindow(QMainWindow):
         ]
         
         for i, (skill_key, label) in enumerate(skill_labels):
-            row = i // 4
-            col = i % 4
-            
-            # Container for label + button
-            container = QWidget()
-            container_layout = QVBoxLayout(container)
-            container_layout.setContentsMargins(0, 0, 0, 0)
-            container_layout.setSpacing(2)
-            
-            # Skill label
-            skill_label = QLabel(label)
-            skill_label.setAlignment(Qt.AlignCenter)
-            skill_label.setStyleSheet("font-weight: bold; color: #2c3e50;")
-            container_layout.addWidget(skill_label)
-            
-            # Hotkey button
-            btn = HotkeyButton(skill_key, "skill", self)
-            self.skill_buttons[skill_key] = btn
-            container_layout.addWidget(btn)
-            
-            skills_layout.addWidget(container, row, col)
+            cell = self._make_hotkey_cell(skill_key, label, "skill")
+            skills_layout.addWidget(cell, i // 4, i % 4)
         
         layout.addWidget(skills_group)
         
         # Items section (3x2 grid = 6 items) - matches War3 inventory layout
         items_group = QGroupBox("🎒 Items (3x2 - War3 Inventory)")
-        items_group.setStyleSheet("QGroupBox { font-weight: bold; font-size: 14px; }")
+        items_group.setObjectName("slotGroup")
         items_layout = QGridLayout(items_group)
         items_layout.setSpacing(10)
         
@@ -283,27 +349,8 @@ class MainWindow(QMainWindow):
         ]
         
         for i, (item_key, label) in enumerate(item_labels):
-            row = i // 3  # 3 columns
-            col = i % 3
-            
-            # Container for label + button
-            container = QWidget()
-            container_layout = QVBoxLayout(container)
-            container_layout.setContentsMargins(0, 0, 0, 0)
-            container_layout.setSpacing(2)
-            
-            # Item label
-            item_label = QLabel(f"Slot {label}")
-            item_label.setAlignment(Qt.AlignCenter)
-            item_label.setStyleSheet("font-weight: bold; color: #d4af37;")  # Gold color like War3
-            container_layout.addWidget(item_label)
-            
-            # Hotkey button
-            btn = HotkeyButton(item_key, "item", self)
-            self.item_buttons[item_key] = btn
-            container_layout.addWidget(btn)
-            
-            items_layout.addWidget(container, row, col)
+            cell = self._make_hotkey_cell(item_key, f"Slot {label}", "item")
+            items_layout.addWidget(cell, i // 3, i % 3)  # 3 columns
         
         layout.addWidget(items_group)
         
@@ -324,9 +371,45 @@ class MainWindow(QMainWindow):
         
         self.tab_widget.addTab(tab, "🎯 Hotkeys")
         
-    def _create_auto_cast_tab(self) -> None:
+    def _on_tab_changed(self, index: int) -> None:
+        """Build a lazily created tab the first time it is shown."""
+        pending = self._pending_tabs.pop(index, None)
+        if pending is None:
+            return
+        builder, loader = pending
+        builder(self.tab_widget.widget(index))
+        self._tab_loaders.append(loader)
+        loader(self.config.snapshot())
+        
+    def _make_hotkey_cell(self, slot_key: str, label_text: str, slot_type: str) -> QWidget:
+        """Create a labelled hotkey button for one skill or item slot.
+        
+        The label is styled by the application stylesheet's slotType rules
+        rather than carrying a stylesheet of its own.
+        """
+        # Container for label + button
+        container = QWidget()
+        container_layout = QVBoxLayout(container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        container_layout.setSpacing(2)
+        
+        label = QLabel(label_text)
+        label.setAlignment(Qt.AlignCenter)
+        # Skill labels are dark, item labels gold like War3
+        label.setProperty("slotType", slot_type)
+        container_layout.addWidget(label)
+        
+        # Hotkey button
+        btn = HotkeyButton(slot_key, slot_type, self)
+        btn.hotkey_changed.connect(self._on_hotkey_changed)
+        btn.hotkey_cleared.connect(self._on_hotkey_cleared)
+        self.buttons[(slot_type, slot_key)] = btn
+        container_layout.addWidget(btn)
+        
+        return container
+        
+    def _create_auto_cast_tab(self, tab: QWidget) -> None:
         """Create the Auto-Cast settings tab."""
-        tab = QWidget()
         layout = QVBoxLayout(tab)
         
         # Enable checkbox
@@ -346,7 +429,7 @@ class MainWindow(QMainWindow):
         list_group = QGroupBox("Auto-Cast Skills")
         list_layout = QVBoxLayout(list_group)
         
-        self.auto_cast_list = QListWidget()
+        self.auto_cast_list = self._make_entry_list()
         list_layout.addWidget(self.auto_cast_list)
         
         # Add skill controls
@@ -376,11 +459,8 @@ class MainWindow(QMainWindow):
         layout.addWidget(list_group)
         layout.addStretch()
         
-        self.tab_widget.addTab(tab, "🔄 Auto-Cast")
-        
-    def _create_macro_tab(self) -> None:
+    def _create_macro_tab(self, tab: QWidget) -> None:
         """Create the Custom Macro settings tab."""
-        tab = QWidget()
         layout = QVBoxLayout(tab)
         
         # Description
@@ -395,7 +475,7 @@ class MainWindow(QMainWindow):
         list_group = QGroupBox("Custom Macros")
         list_layout = QVBoxLayout(list_group)
         
-        self.macro_list = QListWidget()
+        self.macro_list = self._make_entry_list()
         list_layout.addWidget(self.macro_list)
         
         # Add macro controls
@@ -432,11 +512,8 @@ class MainWindow(QMainWindow):
         layout.addWidget(list_group)
         layout.addStretch()
         
-        self.tab_widget.addTab(tab, "📝 Macros")
-        
-    def _create_settings_tab(self) -> None:
+    def _create_settings_tab(self, tab: QWidget) -> None:
         """Create the General Settings tab."""
-        tab = QWidget()
         layout = QVBoxLayout(tab)
         
         # Global settings
@@ -469,7 +546,7 @@ class MainWindow(QMainWindow):
             "which works with DirectX games like Warcraft 3."
         )
         war3_info.setWordWrap(True)
-        war3_info.setStyleSheet("color: #888; font-size: 11px;")
+        war3_info.setObjectName("hint")
         war3_layout.addWidget(war3_info)
         
         layout.addWidget(war3_group)
@@ -494,8 +571,6 @@ class MainWindow(QMainWindow):
         layout.addWidget(info_group)
         layout.addStretch()
         
-        self.tab_widget.addTab(tab, "⚙️ Settings")
-        
     def _create_bottom_buttons(self, layout: QVBoxLayout) -> None:
         """Create the bottom button bar."""
         button_layout = QHBoxLayout()
@@ -505,7 +580,7 @@ class MainWindow(QMainWindow):
         button_layout.addWidget(save_btn)
         
         reload_btn = QPushButton("🔄 Reload Settings")
-        reload_btn.clicked.connect(self._load_settings)
+        reload_btn.clicked.connect(lambda: self._load_settings(force=True))
         button_layout.addWidget(reload_btn)
         
         button_layout.addStretch()
@@ -522,6 +597,7 @@ class MainWindow(QMainWindow):
             self.config.set_quick_cast_hotkey(slot_name, hotkey)
         elif slot_type == "item":
             self.config.set_item_hotkey(slot_name, hotkey)
+        self._flush_timer.start(250)
     
     def _on_hotkey_cleared(self, slot_name: str, slot_type: str) -> None:
         """Handle hotkey cleared from HotkeyButton."""
@@ -529,84 +605,236 @@ class MainWindow(QMainWindow):
             self.config.clear_quick_cast_hotkey(slot_name)
         elif slot_type == "item":
             self.config.clear_item_hotkey(slot_name)
+        self._flush_timer.start(250)
         
-    def _load_settings(self) -> None:
-        """Load settings from config to UI."""
-        self.config.load()
+    def _flush_config(self) -> None:
+        """Save hotkey edits and apply them to the engine once they settle."""
+        if self._settings_changed() and self.config.save():
+            self.engine.apply_diff(self._saved_settings, self.config.settings)
+            self._saved_settings = copy.deepcopy(self.config.settings)
         
-        # Quick-cast settings
-        self.quick_cast_enabled.setChecked(self.config.get_quick_cast_enabled())
-        hotkeys = self.config.get_quick_cast_hotkeys()
-        for skill_key, btn in self.skill_buttons.items():
-            btn.set_hotkey(hotkeys.get(skill_key, ""))
-        
-        # Item settings
-        self.item_enabled.setChecked(self.config.get_item_enabled())
-        item_hotkeys = self.config.get_item_hotkeys()
-        for item_key, btn in self.item_buttons.items():
-            btn.set_hotkey(item_hotkeys.get(item_key, ""))
-        
-        # Auto-cast settings
-        self.auto_cast_enabled.setChecked(self.config.get_auto_cast_enabled())
-        self.auto_cast_list.clear()
-        for skill in self.config.get_auto_cast_skills():
-            item_text = f"Key: {skill.get('hotkey', '')} - Interval: {skill.get('interval_ms', 100)}ms"
-            self.auto_cast_list.addItem(item_text)
-        
-        # Macro settings
-        self.macro_list.clear()
-        for macro in self.config.get_macros():
-            item_text = f"{macro.get('name', '')} [{macro.get('hotkey', '')}]"
-            self.macro_list.addItem(item_text)
+    def _load_settings(self, force: bool = False) -> None:
+        """Load settings from config to UI.
         
-        # Global settings
-        self.global_hotkey.setText(self.config.get_global_hotkey())
+        The checkboxes' toggle handlers are blocked while loading; a forced
+        reload applies the file to the engine once at the end instead.
+        
+        Args:
+            force: Re-read the config file first instead of using the
+                settings already in memory
+        """
+        if force:
+            self.config.load()
+        # One consistent view of the settings for every widget below
+        snap = self.config.snapshot()
+        
+        # Quick-cast and item settings
+        with QSignalBlocker(self.quick_cast_enabled), QSignalBlocker(self.item_enabled):
+            self.quick_cast_enabled.setChecked(snap.quick_cast_enabled)
+            self.item_enabled.setChecked(snap.item_enabled)
+        for (slot_type, slot_key), btn in self.buttons.items():
+            hotkeys = snap.quick_cast_hotkeys if slot_type == "skill" else snap.item_hotkeys
+            btn.set_hotkey(hotkeys.get(slot_key, ""))
+        
+        # Tabs built so far; the rest load their settings when first opened
+        for loader in self._tab_loaders:
+            loader(snap)
+        
+        self._saved_settings = copy.deepcopy(self.config.settings)
+        if force:
+            self.engine.reload_settings()
+        
+    def _load_auto_cast_settings(self, snap: ConfigSnapshot) -> None:
+        """Load auto-cast settings into the Auto-Cast tab."""
+        with QSignalBlocker(self.auto_cast_enabled):
+            self.auto_cast_enabled.setChecked(snap.auto_cast_enabled)
+        self._fill_list(self.auto_cast_list, [
+            (skill.get('hotkey', ''),
+             f"Key: {skill.get('hotkey', '')} - Interval: {skill.get('interval_ms', 100)}ms")
+            for skill in snap.auto_cast_skills
+        ])
+        
+    def _load_macro_settings(self, snap: ConfigSnapshot) -> None:
+        """Load custom macros into the Macros tab."""
+        self._fill_list(self.macro_list, [
+            (macro.get('name', ''), f"{macro.get('name', '')} [{macro.get('hotkey', '')}]")
+            for macro in snap.macros
+        ])
+        
+    @staticmethod
+    def _make_entry_list() -> QListWidget:
+        """Create a list of one-line entries.
+        
+        Every entry is a single line of text, so one size hint serves all
+        rows, and layout is done in batches rather than for every row up
+        front.
+        """
+        list_widget = QListWidget()
+        list_widget.setUniformItemSizes(True)
+        list_widget.setLayoutMode(QListView.Batched)
+        list_widget.setBatchSize(50)
+        return list_widget
+        
+    @staticmethod
+    def _fill_list(list_widget: QListWidget, entries: List[Tuple[str, str]]) -> None:
+        """Make a list show (key, text) entries in one layout pass.
+        
+        Items are matched by key, so a reload only removes, adds, moves or
+        relabels the entries that changed instead of rebuilding the list.
+        """
+        list_widget.setUpdatesEnabled(False)
+        list_widget.blockSignals(True)
+        try:
+            wanted = {key for key, _ in entries}
+            existing: Dict[str, QListWidgetItem] = {}
+            for row in range(list_widget.count() - 1, -1, -1):
+                item = list_widget.item(row)
+                key = item.data(Qt.UserRole)
+                if key in wanted and key not in existing:
+                    existing[key] = item
+                else:
+                    list_widget.takeItem(row)
+            
+            for row, (key, text) in enumerate(entries):
+                # Entries sharing a key reuse at most one existing item
+                item = existing.pop(key, None)
+                if item is None:
+                    item = QListWidgetItem(text)
+                    item.setData(Qt.UserRole, key)
+                    list_widget.insertItem(row, item)
+                    continue
+                current_row = list_widget.row(item)
+                if current_row != row:
+                    list_widget.insertItem(row, list_widget.takeItem(current_row))
+                if item.text() != text:
+                    item.setText(text)
+        finally:
+            list_widget.blockSignals(False)
+            list_widget.setUpdatesEnabled(True)
+        
+    @staticmethod
+    def _append_list_item(list_widget: QListWidget, key: str, text: str) -> None:
+        """Add an entry keyed by hotkey or name, as the config appends it."""
+        item = QListWidgetItem(text)
+        item.setData(Qt.UserRole, key)
+        list_widget.addItem(item)
+        
+    @staticmethod
+    def _remove_list_key(list_widget: QListWidget, key: str) -> None:
+        """Remove the first item with this key, as the config removes the first entry."""
+        for row in range(list_widget.count()):
+            if list_widget.item(row).data(Qt.UserRole) == key:
+                list_widget.takeItem(row)
+                return
+        
+    def _load_general_settings(self, snap: ConfigSnapshot) -> None:
+        """Load global settings into the Settings tab."""
+        self.global_hotkey.setText(snap.global_hotkey)
         
     def _save_settings(self) -> None:
         """Save settings from UI to config."""
-        # Quick-cast settings
+        # Quick-cast and item settings
         self.config.set_quick_cast_enabled(self.quick_cast_enabled.isChecked())
-        for skill_key, btn in self.skill_buttons.items():
-            if btn.hotkey:
-                self.config.set_quick_cast_hotkey(skill_key, btn.hotkey)
-        
-        # Item settings
         self.config.set_item_enabled(self.item_enabled.isChecked())
-        for item_key, btn in self.item_buttons.items():
-            if btn.hotkey:
-                self.config.set_item_hotkey(item_key, btn.hotkey)
+        for (slot_type, slot_key), btn in self.buttons.items():
+            if not btn.hotkey:
+                continue
+            if slot_type == "skill":
+                self.config.set_quick_cast_hotkey(slot_key, btn.hotkey)
+            else:
+                self.config.set_item_hotkey(slot_key, btn.hotkey)
         
-        # Global settings
-        global_key = self.global_hotkey.text().strip()
-        if global_key:
-            self.config.set_global_hotkey(global_key)
+        # Global settings (only editable once the Settings tab was opened)
+        if self.global_hotkey is not None:
+            global_key = self.global_hotkey.text().strip()
+            if global_key:
+                self.config.set_global_hotkey(global_key)
+        
+        # Nothing to write or reload when the settings match the last save
+        if not self._settings_changed():
+            self._toast("No changes to save.")
+            return
         
         # Save to file
-        if self.config.save():
-            QMessageBox.information(self, "Success", "Settings saved successfully!")
-        else:
-            QMessageBox.warning(self, "Error", "Failed to save settings.")
-            
-        # Reload engine settings
-        self.engine.reload_settings()
+        if not self.config.save():
+            self._toast("Failed to save settings.", "error")
+            return
+        
+        # Apply just the changed sections to the engine
+        self.engine.apply_diff(self._saved_settings, self.config.settings)
+        self._saved_settings = copy.deepcopy(self.config.settings)
+        self._toast("Settings saved.")
+        
+    def _settings_changed(self) -> bool:
+        """Check whether the settings differ from the last load or save."""
+        return self.config.settings != self._saved_settings
         
     def _toggle_engine(self) -> None:
-        """Toggle the macro engine on/off."""
+        """Toggle the macro engine on/off.
+        
+        Starting and stopping set up or join the listener and auto-cast
+        threads, so they run on the thread pool; the button stays disabled
+        until the job reports back. The config is only touched here on the
+        GUI thread: it is read before a start is handed off, and the job
+        itself never loads it.
+        """
         if self.engine.running:
-            self.engine.stop()
-            self.toggle_btn.setText("Start")
-            self.status_label.setText("Status: Stopped")
+            call = self.engine.stop
         else:
-            if self.engine.start():
-                self.toggle_btn.setText("Stop")
-                self.status_label.setText("Status: Running")
-            else:
-                QMessageBox.warning(
-                    self, "Error", 
-                    "Failed to start macro engine.\n"
-                    "Make sure pynput is installed correctly."
-                )
+            self.engine.reload_settings()
+            call = functools.partial(self.engine.start, load_settings=False)
+        self._engine_job = _EngineJob(call)
+        self._engine_job.signals.finished.connect(self._on_engine_job_finished)
+        self.toggle_btn.setEnabled(False)
+        QThreadPool.globalInstance().start(self._engine_job)
+        
+    def _on_engine_job_finished(self, ok: bool, error: str) -> None:
+        """Update the controls once an engine start or stop has finished."""
+        self._engine_job = None
+        self.toggle_btn.setEnabled(True)
+        self.toggle_btn.setText("Stop" if self.engine.running else "Start")
+        self._refresh_status()
+        if error:
+            QMessageBox.warning(self, "Error", f"Macro engine error:\n{error}")
+        elif not ok:
+            QMessageBox.warning(
+                self, "Error", 
+                "Failed to start macro engine.\n"
+                "Make sure pynput is installed correctly."
+            )
                 
+    def _drain_engine_events(self) -> None:
+        """Apply engine state changes queued since the last tick."""
+        events = self.engine.events
+        toggled = False
+        while events:
+            kind, _ = events.popleft()
+            if kind == "toggled":
+                toggled = True
+        
+        # The label reflects the current state, however many toggles queued up
+        if toggled:
+            self._refresh_status()
+        
+    def _refresh_status(self) -> None:
+        """Show the engine state in the status label."""
+        if not self.engine.running:
+            text = "Status: Stopped"
+        elif self.engine.enabled:
+            text = "Status: Running"
+        else:
+            text = "Status: Paused"
+        self._toast_timer.stop()
+        self.status_label.setStyleSheet("")
+        self.status_label.setText(text)
+        
+    def _toast(self, message: str, kind: str = "info") -> None:
+        """Briefly show a message in the status label instead of a modal dialog."""
+        color = "#e74c3c" if kind == "error" else "#27ae60"
+        self.status_label.setStyleSheet(f"color: {color};")
+        self.status_label.setText(message)
+        self._toast_timer.start(2000)
+        
     def _on_quick_cast_toggle(self, state: int) -> None:
         """Handle quick-cast toggle."""
         enabled = state == Qt.Checked
@@ -633,13 +861,13 @@ class MainWindow(QMainWindow):
         interval = self.auto_cast_interval.value()
         
         if not hotkey:
-            QMessageBox.warning(self, "Error", "Please enter a hotkey.")
+            self._toast("Please enter a hotkey.", "error")
             return
         
         self.engine.add_auto_cast_skill(hotkey, interval)
         
         item_text = f"Key: {hotkey} - Interval: {interval}ms"
-        self.auto_cast_list.addItem(item_text)
+        self._append_list_item(self.auto_cast_list, hotkey, item_text)
         
         self.auto_cast_hotkey.clear()
         
@@ -647,15 +875,13 @@ class MainWindow(QMainWindow):
         """Remove selected skill from auto-cast list."""
         current = self.auto_cast_list.currentItem()
         if not current:
-            QMessageBox.warning(self, "Error", "Please select a skill to remove.")
+            self._toast("Please select a skill to remove.", "error")
             return
         
-        # Extract hotkey from item text
-        text = current.text()
-        hotkey = text.split("Key: ")[1].split(" -")[0]
+        hotkey = current.data(Qt.UserRole)
         
         if self.engine.remove_auto_cast_skill(hotkey):
-            self.auto_cast_list.takeItem(self.auto_cast_list.row(current))
+            self._remove_list_key(self.auto_cast_list, hotkey)
         
     def _add_macro(self) -> None:
         """Add a custom macro."""
@@ -664,20 +890,21 @@ class MainWindow(QMainWindow):
         actions_str = self.macro_actions.text().strip()
         
         if not name or not hotkey or not actions_str:
-            QMessageBox.warning(self, "Error", "Please fill in all fields.")
+            self._toast("Please fill in all fields.", "error")
             return
         
-        # Parse actions (simple key press sequence)
+        # Parse actions (simple key press sequence, with a delay between keys)
         keys = [k.strip() for k in actions_str.split(",") if k.strip()]
         actions = []
         for key in keys:
+            if actions:
+                actions.append({"type": "delay", "delay_ms": 50})
             actions.append({"type": "key_press", "key": key})
-            actions.append({"type": "delay", "delay_ms": 50})
         
         self.engine.add_macro(name, hotkey, actions)
         
         item_text = f"{name} [{hotkey}]"
-        self.macro_list.addItem(item_text)
+        self._append_list_item(self.macro_list, name, item_text)
         
         self.macro_name.clear()
         self.macro_hotkey.clear()
@@ -687,20 +914,22 @@ class MainWindow(QMainWindow):
         """Remove selected macro."""
         current = self.macro_list.currentItem()
         if not current:
-            QMessageBox.warning(self, "Error", "Please select a macro to remove.")
+            self._toast("Please select a macro to remove.", "error")
             return
         
-        # Extract name from item text
-        text = current.text()
-        name = text.split(" [")[0]
+        name = current.data(Qt.UserRole)
         
         if self.engine.remove_macro(name):
-            self.macro_list.takeItem(self.macro_list.row(current))
+            self._remove_list_key(self.macro_list, name)
             
     def closeEvent(self, event) -> None:
         """Handle window close event."""
+        # Let a pending start finish so the stop below is the last word
+        QThreadPool.globalInstance().waitForDone()
         self.engine.stop()
-        self.config.save()
+        self._flush_timer.stop()
+        if self._settings_changed():
+            self.config.save()
         event.accept()
 
 
@@ -710,7 +939,14 @@ def run_app() -> int:
         print("Error: PyQt5 is not installed. Please install it with: pip install PyQt5")
         return 1
     
+    # Application attributes must be set before the QApplication exists
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+    # Coalesce bursts of mouse-move and tablet events into one per frame
+    QApplication.setAttribute(Qt.AA_CompressHighFrequencyEvents, True)
+    QApplication.setAttribute(Qt.AA_CompressTabletEvents, True)
     app = QApplication(sys.argv)
+    app.setStyleSheet(APP_STYLESHEET)
     window = MainWindow()
     window.show()
     return app.exec_()
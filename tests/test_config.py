@@ -1,54 +1,55 @@
 """Tests for the MacroConfig class."""
+import copy
 import os
-import tempfile
+import subprocess
+import sys
 import pytest
+import yaml
 
-from core.config import MacroConfig
+from core import config as config_module
+from core.config import MacroConfig, _emit_config
 
 
 class TestMacroConfig:
     """Test cases for MacroConfig."""
     
-    def setup_method(self):
-        """Setup test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
+    @pytest.fixture(autouse=True)
+    def setup_config(self, tmp_path):
+        """Setup test fixtures in pytest's per-test temporary directory."""
+        self.temp_dir = str(tmp_path)
         self.config_path = os.path.join(self.temp_dir, "test_config.yaml")
         self.config = MacroConfig(self.config_path)
     
-    def teardown_method(self):
-        """Cleanup test fixtures."""
-        if os.path.exists(self.config_path):
-            os.remove(self.config_path)
-        if os.path.exists(self.temp_dir):
-            os.rmdir(self.temp_dir)
-    
     def test_default_settings(self):
         """Test that default settings are loaded."""
         assert self.config.get_quick_cast_enabled() is True
         assert self.config.get_auto_cast_enabled() is False
         assert "skill_1" in self.config.get_quick_cast_hotkeys()
     
-    def test_set_quick_cast_enabled(self):
-        """Test setting quick-cast enabled state."""
-        self.config.set_quick_cast_enabled(False)
-        assert self.config.get_quick_cast_enabled() is False
+    def test_reset_to_defaults(self):
+        """Test that resetting discards every change."""
+        defaults = copy.deepcopy(self.config.settings)
+        self.config.set_global_hotkey("f10")
+        self.config.add_auto_cast_skill({"hotkey": "q", "interval_ms": 100})
         
-        self.config.set_quick_cast_enabled(True)
-        assert self.config.get_quick_cast_enabled() is True
+        self.config.reset_to_defaults()
+        assert self.config.settings == defaults
+        assert self.config.get_auto_cast_skills() == []
+    
+    @pytest.mark.parametrize("section", ["quick_cast", "auto_cast", "item"])
+    def test_set_enabled(self, section):
+        """Test setting each section's enabled state."""
+        getter = getattr(self.config, f"get_{section}_enabled")
+        setter = getattr(self.config, f"set_{section}_enabled")
+        for enabled in (False, True, False):
+            setter(enabled)
+            assert getter() is enabled
     
     def test_set_quick_cast_hotkey(self):
         """Test setting quick-cast hotkeys."""
         self.config.set_quick_cast_hotkey("skill_1", "a")
         assert self.config.get_quick_cast_hotkeys()["skill_1"] == "a"
     
-    def test_set_auto_cast_enabled(self):
-        """Test setting auto-cast enabled state."""
-        self.config.set_auto_cast_enabled(True)
-        assert self.config.get_auto_cast_enabled() is True
-        
-        self.config.set_auto_cast_enabled(False)
-        assert self.config.get_auto_cast_enabled() is False
-    
     def test_add_auto_cast_skill(self):
         """Test adding auto-cast skills."""
         skill = {"hotkey": "q", "interval_ms": 200}
@@ -59,6 +60,38 @@ class TestMacroConfig:
         assert skills[0]["hotkey"] == "q"
         assert skills[0]["interval_ms"] == 200
     
+    def test_add_auto_cast_skills(self):
+        """Test adding several auto-cast skills at once."""
+        self.config.add_auto_cast_skill({"hotkey": "q", "interval_ms": 200})
+        self.config.add_auto_cast_skills([
+            {"hotkey": "w", "interval_ms": 300},
+            {"hotkey": "e", "interval_ms": 400},
+        ])
+        
+        skills = self.config.get_auto_cast_skills()
+        assert [s["hotkey"] for s in skills] == ["q", "w", "e"]
+    
+    def test_duplicate_skills_survive_load_and_save(self):
+        """Test that skills sharing a hotkey in the file are all kept."""
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write(
+                "auto_cast:\n"
+                "  skills:\n"
+                "  - {hotkey: q, interval_ms: 100}\n"
+                "  - {hotkey: q, interval_ms: 200}\n"
+            )
+        config = MacroConfig(self.config_path)
+        assert config.load() is True
+        expected = [{"hotkey": "q", "interval_ms": 100}, {"hotkey": "q", "interval_ms": 200}]
+        assert config.get_auto_cast_skills() == expected
+        
+        # Adding another hotkey leaves both duplicates in place
+        config.add_auto_cast_skill({"hotkey": "w", "interval_ms": 300})
+        assert config.save() is True
+        reloaded = MacroConfig(self.config_path)
+        assert reloaded.load() is True
+        assert reloaded.get_auto_cast_skills() == expected + [{"hotkey": "w", "interval_ms": 300}]
+    
     def test_remove_auto_cast_skill(self):
         """Test removing auto-cast skills."""
         skill = {"hotkey": "q", "interval_ms": 200}
@@ -70,6 +103,16 @@ class TestMacroConfig:
         # Try to remove non-existent skill
         assert self.config.remove_auto_cast_skill("w") is False
     
+    def test_remove_auto_cast_skill_removes_first_match(self):
+        """Test that removing a shared hotkey only removes its first skill."""
+        self.config.add_auto_cast_skills([
+            {"hotkey": "q", "interval_ms": 100},
+            {"hotkey": "q", "interval_ms": 200},
+        ])
+        
+        assert self.config.remove_auto_cast_skill("q") is True
+        assert self.config.get_auto_cast_skills() == [{"hotkey": "q", "interval_ms": 200}]
+    
     def test_add_macro(self):
         """Test adding custom macros."""
         macro = {
@@ -116,6 +159,172 @@ class TestMacroConfig:
         assert new_config.get_auto_cast_enabled() is True
         assert len(new_config.get_auto_cast_skills()) == 1
     
+    def test_reload_picks_up_file_changes(self):
+        """Test that cached loads are invalidated when the file changes."""
+        self.config.set_global_hotkey("f10")
+        self.config.save()
+        
+        first = MacroConfig(self.config_path)
+        assert first.load() is True
+        assert first.get_global_hotkey() == "f10"
+        
+        # Loaded settings must not share state with the cache
+        first.set_global_hotkey("f11")
+        second = MacroConfig(self.config_path)
+        assert second.load() is True
+        assert second.get_global_hotkey() == "f10"
+        
+        self.config.set_global_hotkey("f12")
+        self.config.save()
+        assert second.load() is True
+        assert second.get_global_hotkey() == "f12"
+    
+    def test_save_skips_unchanged_settings(self):
+        """Test that saving identical settings does not rewrite the file."""
+        assert self.config.save() is True
+        mtime = os.stat(self.config_path).st_mtime_ns
+        
+        # Nothing changed
+        assert self.config.save() is True
+        # Changed to the same value
+        self.config.set_global_hotkey("f9")
+        assert self.config.save() is True
+        assert os.stat(self.config_path).st_mtime_ns == mtime
+        assert not os.path.exists(self.config_path + ".tmp")
+        
+        self.config.set_global_hotkey("f10")
+        assert self.config.save() is True
+        new_config = MacroConfig(self.config_path)
+        new_config.load()
+        assert new_config.get_global_hotkey() == "f10"
+    
+    def test_save_after_load_skips_unchanged_settings(self):
+        """Test that saving freshly loaded settings does not rewrite the file."""
+        self.config.set_global_hotkey("f10")
+        assert self.config.save() is True
+        mtime = os.stat(self.config_path).st_mtime_ns
+        
+        loaded = MacroConfig(self.config_path)
+        assert loaded.load() is True
+        loaded.set_global_hotkey("f10")
+        assert loaded.save() is True
+        assert os.stat(self.config_path).st_mtime_ns == mtime
+    
+    def test_save_writes_changes_made_through_getters(self):
+        """Test that settings changed in place through a getter are saved."""
+        self.config.add_auto_cast_skill({"hotkey": "q", "interval_ms": 100})
+        assert self.config.save() is True
+        
+        self.config.get_auto_cast_skills()[0]["interval_ms"] = 250
+        self.config.get_quick_cast_hotkeys()["skill_1"] = "z"
+        assert self.config.save() is True
+        
+        loaded = MacroConfig(self.config_path)
+        assert loaded.load() is True
+        assert loaded.get_auto_cast_skills() == [{"hotkey": "q", "interval_ms": 250}]
+        assert loaded.get_quick_cast_hotkeys()["skill_1"] == "z"
+    
+    def test_batch_writes_once(self):
+        """Test that saves inside a batch are deferred to its end."""
+        with self.config.batch():
+            self.config.set_global_hotkey("f10")
+            assert self.config.save() is True
+            assert not os.path.exists(self.config_path)
+            self.config.add_auto_cast_skill({"hotkey": "q", "interval_ms": 100})
+        
+        loaded = MacroConfig(self.config_path)
+        assert loaded.load() is True
+        assert loaded.get_global_hotkey() == "f10"
+        assert loaded.get_auto_cast_skills() == [{"hotkey": "q", "interval_ms": 100}]
+    
+    def test_save_recreates_missing_directory(self):
+        """Test that saving recreates a config directory removed after startup."""
+        os.rmdir(self.temp_dir)
+        
+        self.config.set_global_hotkey("f10")
+        assert self.config.save() is True
+        assert os.path.exists(self.config_path)
+    
+    def test_json_sidecar(self):
+        """Test that the JSON sidecar is used only while newer than the YAML."""
+        self.config.set_global_hotkey("f10")
+        assert self.config.save() is True
+        assert os.path.exists(self.config.json_cache_path)
+        
+        new_config = MacroConfig(self.config_path)
+        assert new_config.load() is True
+        assert new_config.get_global_hotkey() == "f10"
+        
+        # A hand-edited YAML file takes precedence over a stale sidecar
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write("global_hotkey: f11\n")
+        st = os.stat(self.config.json_cache_path)
+        os.utime(self.config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        
+        edited = MacroConfig(self.config_path)
+        assert edited.load() is True
+        assert edited.get_global_hotkey() == "f11"
+    
+    def test_touched_file_reuses_parse_by_content(self, monkeypatch):
+        """Test that a file touched without edits is not parsed again."""
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write("global_hotkey: f11\n")
+        assert MacroConfig(self.config_path).load() is True
+        
+        os.remove(self.config.json_cache_path)
+        st = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        monkeypatch.setattr(config_module, "_get_yaml", lambda: pytest.fail("YAML parsed again"))
+        
+        touched = MacroConfig(self.config_path)
+        assert touched.load() is True
+        assert touched.get_global_hotkey() == "f11"
+    
+    def test_emit_config_matches_yaml_dump(self):
+        """Test that the config emitter produces the same YAML as PyYAML."""
+        self.config.clear_quick_cast_hotkey("skill_8")
+        self.config.add_auto_cast_skill({"hotkey": "q", "interval_ms": 100})
+        self.config.add_macro({
+            "name": "combo_1",
+            "hotkey": "x",
+            "actions": [
+                {"type": "key_press", "key": "q"},
+                {"type": "delay", "delay_ms": 50},
+                {"type": "combo", "keys": ["1", "yes", "a b"]},
+            ]
+        })
+        
+        text = _emit_config(self.config.settings)
+        assert text == yaml.dump(self.config.settings, default_flow_style=False, allow_unicode=True)
+        assert yaml.safe_load(text) == self.config.settings
+    
+    def test_emit_config_rejects_unsupported_values(self):
+        """Test that unsupported values raise ValueError so save can fall back."""
+        with pytest.raises(ValueError):
+            _emit_config({"ratio": 0.5})
+        
+        self.config.settings["ratio"] = 0.5
+        assert self.config.save() is True
+        new_config = MacroConfig(self.config_path)
+        new_config.load()
+        assert new_config.settings["ratio"] == 0.5
+    
+    def test_cached_load_does_not_import_yaml(self):
+        """Test that loading through the JSON sidecar never imports PyYAML."""
+        assert self.config.save() is True
+        
+        script = (
+            "import sys\n"
+            "from core.config import MacroConfig\n"
+            f"assert MacroConfig({self.config_path!r}).load()\n"
+            "print('yaml' in sys.modules)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "False"
+    
     def test_global_hotkey(self):
         """Test global hotkey settings."""
         assert self.config.get_global_hotkey() == "f9"
@@ -148,6 +357,18 @@ class TestMacroConfig:
         
         self.config.clear_quick_cast_hotkey("skill_1")
         assert self.config.get_quick_cast_hotkeys()["skill_1"] == ""
+    
+    def test_snapshot(self):
+        """Test that a snapshot is unaffected by later changes."""
+        self.config.set_quick_cast_hotkey("skill_1", "a")
+        snap = self.config.snapshot()
+        assert snap.quick_cast_hotkeys["skill_1"] == "a"
+        assert snap.global_hotkey == "f9"
+        
+        self.config.set_quick_cast_hotkey("skill_1", "b")
+        self.config.add_macro({"name": "Combo", "hotkey": "f", "keys": ["q", "w"], "delay": 50})
+        assert snap.quick_cast_hotkeys["skill_1"] == "a"
+        assert snap.macros == []
 
 
 if __name__ == "__main__":
@@ -1,36 +1,71 @@
 """Tests for the MacroEngine class."""
+import copy
 import os
-import tempfile
 import pytest
+import subprocess
+import sys
+import threading
 import time
 
 from core.config import MacroConfig
+from core import macro_engine as macro_engine_module
 from core.macro_engine import MacroEngine, PYNPUT_AVAILABLE
 
 
 class TestMacroEngine:
     """Test cases for MacroEngine."""
     
-    def setup_method(self):
-        """Setup test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
+    @pytest.fixture(autouse=True)
+    def setup_engine(self, tmp_path):
+        """Setup test fixtures in pytest's per-test temporary directory."""
+        self.temp_dir = str(tmp_path)
         self.config_path = os.path.join(self.temp_dir, "test_config.yaml")
         self.config = MacroConfig(self.config_path)
         self.engine = MacroEngine(self.config)
-    
-    def teardown_method(self):
-        """Cleanup test fixtures."""
+        yield
         self.engine.stop()
-        if os.path.exists(self.config_path):
-            os.remove(self.config_path)
-        if os.path.exists(self.temp_dir):
-            os.rmdir(self.temp_dir)
     
     def test_initial_state(self):
         """Test engine initial state."""
         assert self.engine.running is False
         assert self.engine.enabled is False
     
+    def test_construction_uses_loaded_settings(self):
+        """Test that an engine built on a loaded config needs no reload."""
+        self.config.set_quick_cast_enabled(False)
+        self.config.set_auto_cast_enabled(True)
+        self.config.add_macro({"name": "m", "hotkey": "x", "actions": []})
+        
+        engine = MacroEngine(self.config)
+        assert engine._quick_cast_enabled is False
+        assert engine._auto_cast_enabled is True
+        assert "x" in engine._macro_map
+    
+    def test_construction_does_not_import_pynput(self):
+        """Test that pynput is only imported once the engine starts."""
+        script = (
+            "import sys\n"
+            "from core.config import MacroConfig\n"
+            "from core.macro_engine import MacroEngine\n"
+            f"MacroEngine(MacroConfig({self.config_path!r})).set_quick_cast_enabled(True)\n"
+            "print('pynput' in sys.modules)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "False"
+    
+    def test_start_fails_when_pynput_import_fails(self, monkeypatch):
+        """Test that start reports failure when pynput is found but won't import."""
+        monkeypatch.setattr(macro_engine_module, "PYNPUT_AVAILABLE", True)
+        monkeypatch.setattr(macro_engine_module, "keyboard", None)
+        monkeypatch.setitem(sys.modules, "pynput", None)
+        
+        assert self.engine.start() is False
+        assert self.engine.running is False
+        assert self.engine.enabled is False
+    
     def test_quick_cast_settings(self):
         """Test quick-cast enable/disable."""
         self.engine.set_quick_cast_enabled(True)
@@ -75,6 +110,16 @@ class TestMacroEngine:
         assert macros[0]["name"] == "test_macro"
         assert macros[0]["hotkey"] == "x"
     
+    def test_add_macros(self):
+        """Test adding several macros through engine at once."""
+        self.engine.add_macros([
+            {"name": "m1", "hotkey": "x", "actions": []},
+            {"name": "m2", "hotkey": "z", "actions": []},
+        ])
+        
+        assert [m["name"] for m in self.config.get_macros()] == ["m1", "m2"]
+        assert set(self.engine._macro_map) == {"x", "z"}
+    
     def test_remove_macro(self):
         """Test removing custom macro through engine."""
         actions = [{"type": "key_press", "key": "q"}]
@@ -83,6 +128,216 @@ class TestMacroEngine:
         assert self.engine.remove_macro("test_macro") is True
         assert len(self.config.get_macros()) == 0
     
+    def test_macro_hotkey_lookup(self, monkeypatch):
+        """Test that macro hotkeys are matched case-insensitively."""
+        actions = [{"type": "key_press", "key": "q"}]
+        self.engine.add_macro("test_macro", "X", actions)
+        
+        triggered = []
+        monkeypatch.setattr(MacroEngine, "_execute_macro", lambda engine, macro: triggered.append(macro))
+        self.engine._handle_macro_hotkey("x")
+        self.engine._handle_macro_hotkey("y")
+        self.engine._handle_macro_hotkey(None)
+        
+        assert [m["name"] for m in triggered] == ["test_macro"]
+        
+        self.engine.remove_macro("test_macro")
+        self.engine._handle_macro_hotkey("x")
+        assert len(triggered) == 1
+    
+    def test_global_hotkey_toggles(self):
+        """Test that the global hotkey toggles the engine."""
+        class SpecialKey:
+            def __str__(self):
+                return "Key.f9"
+        
+        class CharKey:
+            char = "Q"
+        
+        self.engine._handle_key_press(SpecialKey())
+        assert self.engine.enabled is True
+        
+        # Non-matching keys leave the state untouched
+        self.engine._handle_key_press(CharKey())
+        assert self.engine.enabled is True
+        
+        self.engine._handle_key_press(SpecialKey())
+        assert self.engine.enabled is False
+        
+        # Each toggle is queued for the GUI
+        assert list(self.engine.events) == [("toggled", True), ("toggled", False)]
+    
+    def test_stop_auto_cast_is_immediate(self):
+        """Test that stopping auto-cast does not wait out the skill interval."""
+        tapped = threading.Event()
+        self.engine._tap_key = lambda key: tapped.set()
+        self.engine._tap_keys = lambda keys: tapped.set()
+        self.engine.add_auto_cast_skill("q", 5000)
+        self.engine.enabled = True
+        self.engine._start_auto_cast_thread()
+        # The first cast is due at once; after it the thread waits 5 s
+        assert tapped.wait(1)
+        
+        start = time.monotonic()
+        self.engine._stop_auto_cast_thread()
+        assert time.monotonic() - start < 0.5
+    
+    def test_auto_cast_schedules_skills_independently(self):
+        """Test that each skill fires on its own interval, batching due skills."""
+        taps = []
+        enough = threading.Event()
+        
+        def record(keys):
+            taps.append(keys)
+            if len(taps) == 3:
+                enough.set()
+        
+        self.engine._tap_key = lambda key: record([key])
+        self.engine._tap_keys = lambda keys: record(list(keys))
+        self.engine.add_auto_cast_skill("q", 20)
+        self.engine.add_auto_cast_skill("w", 5000)
+        self.engine.enabled = True
+        self.engine._start_auto_cast_thread()
+        assert enough.wait(2)
+        self.engine._stop_auto_cast_thread()
+        
+        # Both skills are due at start and go out together
+        assert taps[0] == ["q", "w"]
+        assert len(taps) > 2
+        assert all(batch == ["q"] for batch in taps[1:])
+    
+    def test_macro_runs_once_at_a_time(self):
+        """Test that a running macro is not re-triggered until it finishes."""
+        self.engine.add_macro("slow", "x", [{"type": "delay", "delay_ms": 100}])
+        self.engine.enabled = True
+        
+        self.engine._handle_macro_hotkey("x")
+        self.engine._handle_macro_hotkey("x")
+        assert list(self.engine._inflight_macros) == ["slow"]
+        
+        deadline = time.monotonic() + 2
+        while self.engine._inflight_macros and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.engine._inflight_macros == {}
+    
+    def test_stopped_macro_keeps_newer_run_inflight(self):
+        """Test that a stopped run finishing late does not free a newer run."""
+        gates = [threading.Event(), threading.Event()]
+        started = []
+        finished = []
+        
+        def tap(key):
+            run = len(started)
+            started.append(run)
+            gates[run].wait(2)
+            finished.append(run)
+        
+        self.engine._tap_key = tap
+        self.engine.add_macro("slow", "x", [{"type": "key_press", "key": "q"}])
+        self.engine.enabled = True
+        
+        self.engine._handle_macro_hotkey("x")
+        deadline = time.monotonic() + 2
+        while not started and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.engine._stop_all_macros()
+        self.engine._handle_macro_hotkey("x")
+        while len(started) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        # The old run finishes while the new one is still going
+        gates[0].set()
+        while not finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert "slow" in self.engine._inflight_macros
+        self.engine._handle_macro_hotkey("x")
+        assert len(started) == 2
+        
+        gates[1].set()
+        while self.engine._inflight_macros and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.engine._inflight_macros == {}
+    
+    def test_stopping_macros_cancels_delays(self):
+        """Test that a macro waiting on a delay stops without finishing it."""
+        taps = []
+        self.engine._tap_key = taps.append
+        self.engine.add_macro("slow", "x", [
+            {"type": "delay", "delay_ms": 5000},
+            {"type": "key_press", "key": "q"},
+        ])
+        self.engine.enabled = True
+        self.engine._handle_macro_hotkey("x")
+        time.sleep(0.05)
+        
+        start = time.monotonic()
+        self.engine.toggle()
+        assert self.engine.enabled is False
+        # Re-enabling right away must not resume the cancelled macro
+        self.engine.toggle()
+        time.sleep(0.1)
+        assert time.monotonic() - start < 1
+        assert taps == []
+    
+    def test_execute_action_dispatch(self):
+        """Test that actions are routed to the bound input backend."""
+        events = []
+        self.engine._tap_key = lambda key: events.append(("tap", key))
+        self.engine._press_key = lambda key: events.append(("down", key))
+        self.engine._release_key = lambda key: events.append(("up", key))
+        
+        self.engine._execute_action({"type": "key_press", "key": "q"})
+        self.engine._execute_action({"type": "combo", "keys": ["a", "b"]})
+        self.engine._execute_action({"type": "unknown"})
+        
+        assert events == [
+            ("tap", "q"),
+            ("down", "a"), ("down", "b"), ("up", "b"), ("up", "a"),
+        ]
+    
+    def test_compiled_durations_stay_out_of_config(self):
+        """Test that precomputed durations are not written back to the config."""
+        self.engine.add_macro("hold", "x", [{"type": "key_hold", "key": "q", "duration_ms": 250}])
+        self.engine.add_auto_cast_skill("w", 300)
+        
+        assert self.engine._macro_map["x"]["actions"][0]["_duration_s"] == 0.25
+        assert self.engine._autocast_cached[0]["_interval_s"] == 0.3
+        assert "_duration_s" not in self.config.get_macros()[0]["actions"][0]
+        assert "_interval_s" not in self.config.get_auto_cast_skills()[0]
+    
+    def test_compile_macro_batches_key_presses(self):
+        """Test that back-to-back key presses are merged into one batch."""
+        compiled = MacroEngine._compile_macro({"name": "m", "hotkey": "x", "actions": [
+            {"type": "key_press", "key": "q"},
+            {"type": "key_press", "key": "w"},
+            {"type": "delay", "delay_ms": 50},
+            {"type": "key_press", "key": "e"},
+        ]})
+        
+        assert compiled["actions"] == [
+            {"type": "key_sequence", "keys": ["q", "w"]},
+            {"type": "delay", "delay_ms": 50, "_delay_s": 0.05},
+            {"type": "key_press", "key": "e"},
+        ]
+    
+    def test_compile_macro_prebuilds_input_batches(self):
+        """Test that key runs are pre-built when an input builder is given."""
+        compiled = MacroEngine._compile_macro({"name": "m", "hotkey": "x", "actions": [
+            {"type": "key_press", "key": "q"},
+            {"type": "key_press", "key": "w"},
+            {"type": "delay", "delay_ms": 50},
+        ]}, build_inputs=tuple)
+        
+        assert compiled["actions"][0] == {
+            "type": "input_batch", "keys": ["q", "w"], "_inputs": ("q", "w"),
+        }
+        
+        sent = []
+        self.engine._send_inputs = sent.append
+        self.engine._execute_action(compiled["actions"][0])
+        assert sent == [("q", "w")]
+    
     def test_save_settings(self):
         """Test saving settings through engine."""
         self.engine.add_auto_cast_skill("w", 300)
@@ -100,6 +355,16 @@ class TestMacroEngine:
         # Engine should have reloaded the setting
         assert self.config.get_quick_cast_enabled() is False
     
+    def test_apply_diff_rebuilds_changed_sections(self):
+        """Test that apply_diff only rebuilds tables for changed sections."""
+        old = copy.deepcopy(self.config.settings)
+        macro_map = self.engine._macro_map
+        self.config.set_quick_cast_hotkey("skill_1", "z")
+        
+        self.engine.apply_diff(old, self.config.settings)
+        assert self.engine._quick_cast_map["z"] == "skill_1"
+        assert self.engine._macro_map is macro_map
+    
     def test_direct_input_settings(self):
         """Test DirectInput enable/disable."""
         # Test setting DirectInput mode
@@ -115,14 +380,24 @@ class TestMacroEngine:
     @pytest.mark.skipif(not PYNPUT_AVAILABLE, reason="pynput not available")
     def test_start_stop(self):
         """Test starting and stopping the engine."""
+        assert self.engine.wait_ready(0) is False
         assert self.engine.start() is True
         assert self.engine.running is True
         assert self.engine.enabled is True
+        assert self.engine.wait_ready() is True
         
         self.engine.stop()
+        assert self.engine.wait_ready(0) is False
         assert self.engine.running is False
         assert self.engine.enabled is False
     
+    @pytest.mark.skipif(not PYNPUT_AVAILABLE, reason="pynput not available")
+    def test_start_without_loading_settings(self, monkeypatch):
+        """Test that start can leave the config alone for its owning thread."""
+        monkeypatch.setattr(MacroConfig, "load", lambda config: pytest.fail("config loaded"))
+        assert self.engine.start(load_settings=False) is True
+        assert self.engine.running is True
+    
     @pytest.mark.skipif(not PYNPUT_AVAILABLE, reason="pynput not available")
     def test_toggle(self):
         """Test toggling the engine."""
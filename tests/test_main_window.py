@@ -0,0 +1,35 @@
+"""Tests for the main window's helpers."""
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from gui.main_window import _EngineJob
+
+
+class TestEngineJob:
+    """Test cases for the engine start/stop job."""
+    
+    def run_job(self, call):
+        """Run a job inline and return what its finished signal reported."""
+        results = []
+        job = _EngineJob(call)
+        job.signals.finished.connect(lambda ok, error: results.append((ok, error)))
+        job.run()
+        return results
+    
+    def test_reports_result(self):
+        """Test that start's result and stop's None are reported."""
+        assert self.run_job(lambda: True) == [(True, "")]
+        assert self.run_job(lambda: False) == [(False, "")]
+        assert self.run_job(lambda: None) == [(True, "")]
+    
+    def test_reports_exception_once(self):
+        """Test that a raising call still reports back, as a failure."""
+        def fail():
+            raise RuntimeError("listener failed")
+        
+        assert self.run_job(fail) == [(False, "RuntimeError: listener failed")]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
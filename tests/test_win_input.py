@@ -1,11 +1,16 @@
 """Tests for the Windows DirectInput module."""
+import ctypes
+import time
+
 import pytest
 
+from core import win_input
 from core.win_input import (
     get_direct_input_controller,
     WINDOWS_AVAILABLE,
     DirectInputController,
-    FallbackController
+    FallbackController,
+    HighResTimer
 )
 
 
@@ -22,6 +27,9 @@ class TestDirectInputController:
         else:
             assert isinstance(controller, FallbackController)
             assert controller.available is False
+        
+        # The controller is created once and shared
+        assert get_direct_input_controller() is controller
     
     def test_fallback_controller(self):
         """Test that fallback controller returns False for all operations."""
@@ -31,7 +39,9 @@ class TestDirectInputController:
         assert controller.press_key('a') is False
         assert controller.release_key('a') is False
         assert controller.tap_key('a') is False
+        assert controller.tap_keys(['a', 'b']) is False
         assert controller.click_mouse('left') is False
+        assert controller.build_key_inputs(['a']) is None
     
     @pytest.mark.skipif(not WINDOWS_AVAILABLE, reason="Windows not available")
     def test_direct_input_controller_available(self):
@@ -46,5 +56,96 @@ class TestDirectInputController:
         assert controller.available is False
 
 
+class TestInputLayout:
+    """Test cases for the INPUT offsets used by the packed writes."""
+    
+    def test_structure_sizes_match_windows(self):
+        """Test that INPUT has the size SendInput expects for this pointer width."""
+        assert win_input._INPUT_SIZE == (40 if ctypes.sizeof(ctypes.c_void_p) == 8 else 28)
+        assert win_input.KEYBDINPUT.dwFlags.offset - win_input.KEYBDINPUT.wScan.offset == 2
+    
+    def test_packed_fields_land_in_the_structure(self):
+        """Test that the packs write the fields the structures read back."""
+        inputs = (win_input.INPUT * 2)()
+        win_input._KEY_INPUT.pack_into(inputs, 0, win_input.INPUT_KEYBOARD, 0x10, 0x0A)
+        win_input._KEY_FIELDS.pack_into(inputs, win_input._INPUT_SIZE + win_input._OFF_KI, 0x11, 0x08)
+        win_input._MOUSE_FLAGS.pack_into(inputs, win_input._OFF_MI_FLAGS, 0x0A)
+        
+        assert inputs[0].type == win_input.INPUT_KEYBOARD
+        assert inputs[0].union.ki.wVk == 0
+        assert inputs[0].union.ki.wScan == 0x10
+        assert inputs[0].union.mi.dwFlags == 0x0A
+        assert (inputs[1].union.ki.wScan, inputs[1].union.ki.dwFlags) == (0x11, 0x08)
+
+
+class TestPackedSends:
+    """Test cases for the packed SendInput paths, with SendInput recorded."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_controller(self, monkeypatch):
+        """Build a controller whose SendInput calls are recorded."""
+        self.calls = []
+        
+        def send_input(count, inputs, size):
+            assert size == win_input._INPUT_SIZE
+            # Single events are passed by reference, arrays by pointer
+            events = [inputs._obj] if hasattr(inputs, "_obj") else inputs[:count]
+            self.calls.append([self.decode(inp) for inp in events])
+            return count
+        
+        monkeypatch.setattr(win_input, "WINDOWS_AVAILABLE", True)
+        monkeypatch.setattr(win_input, "_SendInput", send_input, raising=False)
+        self.controller = DirectInputController()
+    
+    @staticmethod
+    def decode(inp):
+        """Read a keyboard event back as (type, wVk, wScan, dwFlags)."""
+        ki = inp.union.ki
+        return (inp.type, ki.wVk, ki.wScan, ki.dwFlags)
+    
+    def test_tap_key_sends_pair(self):
+        """Test that a tap queues press and release in one call."""
+        assert self.controller.tap_key('q') is True
+        assert self.calls == [[(1, 0, 0x10, 0x08), (1, 0, 0x10, 0x0A)]]
+    
+    def test_build_key_inputs(self):
+        """Test that built arrays hold a press and release per known key."""
+        inputs = self.controller.build_key_inputs(['q', 'unknown', 'W'])
+        assert [self.decode(inp) for inp in inputs] == [
+            (1, 0, 0x10, 0x08), (1, 0, 0x10, 0x0A),
+            (1, 0, 0x11, 0x08), (1, 0, 0x11, 0x0A),
+        ]
+        assert self.controller.build_key_inputs(['unknown']) is None
+    
+    def test_tap_keys_splits_long_runs(self):
+        """Test that runs longer than the pool go out in several calls."""
+        keys = ['q'] * (win_input._BATCH_SIZE // 2) + ['w']
+        assert self.controller.tap_keys(keys) is True
+        
+        assert [len(call) for call in self.calls] == [win_input._BATCH_SIZE, 2]
+        assert self.calls[1] == [(1, 0, 0x11, 0x08), (1, 0, 0x11, 0x0A)]
+        assert all(event[2] == 0x10 for event in self.calls[0])
+    
+    def test_min_hold_sends_press_and_release_apart(self):
+        """Test that a minimum hold splits taps into two calls."""
+        self.controller.min_hold_s = 0.001
+        assert self.controller.tap_keys(['q', 'unknown']) is True
+        assert self.calls == [[(1, 0, 0x10, 0x08)], [(1, 0, 0x10, 0x0A)]]
+
+
+class TestHighResTimer:
+    """Test cases for the high-resolution sleep timer."""
+    
+    def test_sleep_and_close(self):
+        """Test that the timer sleeps at least the requested time."""
+        timer = HighResTimer()
+        start = time.monotonic()
+        timer.sleep(0.005)
+        assert time.monotonic() - start >= 0.004
+        
+        timer.close()
+        timer.close()  # Closing twice is harmless
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])